@@ -4,8 +4,11 @@ Bar Chart Racer - Create animated bar and line chart races using matplotlib and
 
 from ._bar_chart_race import bar_chart_race
 from ._bar_chart_race_plotly import bar_chart_race_plotly
-from ._line_chart_race import line_chart_race
+from ._line_chart_race import line_chart_frame, line_chart_race
+from ._segments import render_segments
 from ._utils import load_dataset, prepare_wide_data, prepare_long_data
+from ._writers import (APNGWriter, FrameSequenceWriter, GifWriter, PipelinedWriter, 
+                       ResizeWriter, TeeWriter, WebPWriter)
 from . import _pandas_accessor
 
 __version__ = '1.0.0'
@@ -15,5 +18,14 @@ __all__ = [
     'load_dataset',
     'prepare_wide_data',
     'prepare_long_data',
-    'line_chart_race'
+    'line_chart_race',
+    'line_chart_frame',
+    'render_segments',
+    'GifWriter',
+    'WebPWriter',
+    'APNGWriter',
+    'FrameSequenceWriter',
+    'PipelinedWriter',
+    'TeeWriter',
+    'ResizeWriter'
 ]
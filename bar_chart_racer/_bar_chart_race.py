@@ -4,11 +4,13 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import ticker
-from ._func_animation import FuncAnimation
-from matplotlib.colors import Colormap
+from matplotlib.colors import Colormap, to_rgba_array
+from matplotlib.text import Text
 
 from ._common_chart import CommonChart
+from ._raster import RasterFrame, draw_rect, draw_text, draw_vline, get_clip
 from ._utils import prepare_wide_data
+from ._writers import grab_buffer
 
 class _BarChartRace(CommonChart):
     
@@ -17,8 +19,15 @@ class _BarChartRace(CommonChart):
                  period_label, period_template, period_summary_func, perpendicular_bar_func, 
                  colors, title, bar_size, bar_textposition, bar_texttemplate, bar_label_font, 
                  tick_label_font, tick_template, shared_fontdict, scale, fig, writer, 
-                 bar_kwargs, fig_kwargs, filter_column_colors):
+                 bar_kwargs, fig_kwargs, filter_column_colors, output, step_budget, 
+                 frame_range, period_range, checkpoint_dir, backend):
+        # hash the parameters before any of them are modified below
+        self.params = {k: v for k, v in locals().items() 
+                       if k not in ('self', 'df', 'filename', 'output', 'checkpoint_dir')}
+        # every column feeds the chart, even those not drawn as bars or lines
+        self.df = df
         self.filename = filename
+        self.output = output
         self.extension = self.get_extension()
         self.orientation = orientation
         self.sort = sort
@@ -26,6 +35,10 @@ class _BarChartRace(CommonChart):
         self.fixed_order = fixed_order
         self.fixed_max = fixed_max
         self.steps_per_period = steps_per_period
+        self.step_budget = step_budget
+        self.frame_range = frame_range
+        self.period_range = period_range
+        self.checkpoint_dir = checkpoint_dir
         self.period_length = period_length
         self.end_period_pause = end_period_pause
         self.interpolate_period = interpolate_period
@@ -43,8 +56,8 @@ class _BarChartRace(CommonChart):
         self.orig_rcParams = self.set_shared_fontdict(shared_fontdict)
         self.scale = scale
         self.fps = 1000 / self.period_length * steps_per_period
-        self.writer = self.get_writer(writer)
         self.filter_column_colors = filter_column_colors
+        self.backend = backend
         self.extra_pixels = 0
         self.validate_params()
 
@@ -52,18 +65,17 @@ class _BarChartRace(CommonChart):
         self.html = self.filename is None
         self.df_values, self.df_ranks = self.prepare_data(df)
         self.col_filt = self.get_col_filt()
+        self.scheduled_rows = self.get_scheduled_rows(self.n_bars)
         self.bar_colors = self.get_bar_colors(colors)
         self.str_index = self.df_values.index.astype('str')
         self.fig_kwargs = self.get_fig_kwargs(fig_kwargs)
         self.subplots_adjust = self.get_subplots_adjust()
         self.fig = self.get_fig(fig)
+        self.writer = self.get_writer(writer)
+        self.raster = None
 
     def validate_params(self):
-        if isinstance(self.filename, str):
-            if '.' not in self.filename:
-                raise ValueError('`filename` must have an extension')
-        elif self.filename is not None:
-            raise TypeError('`filename` must be None or a string')
+        self.validate_filename()
             
         if self.sort not in ('asc', 'desc'):
             raise ValueError('`sort` must be "asc" or "desc"')
@@ -74,6 +86,19 @@ class _BarChartRace(CommonChart):
         if self.bar_textposition not in ('outside', 'inside', None):
             raise ValueError('`bar_textposition` must be one of "outside", "inside" or None')
 
+        self.validate_output()
+        self.validate_step_budget()
+        self.validate_ranges()
+        self.validate_checkpoint_dir()
+
+        if self.backend not in ('matplotlib', 'raster'):
+            raise ValueError('`backend` must be "matplotlib" or "raster"')
+        if self.backend == 'raster':
+            if self.orientation != 'h':
+                raise ValueError('`backend="raster"` only draws horizontal bars')
+            if self.scale != 'linear':
+                raise ValueError('`backend="raster"` only draws a linear `scale`')
+
     def get_bar_kwargs(self, bar_kwargs):
         bar_kwargs = bar_kwargs or {}
         if 'width' in bar_kwargs or 'height' in bar_kwargs:
@@ -233,6 +258,9 @@ class _BarChartRace(CommonChart):
                                     "To reduce color repetition, set `filter_column_colors` to `True`")
         return bar_colors
 
+    def get_data_colors(self):
+        return self.bar_colors, self.bar_kwargs['alpha']
+
     def get_max_plotted_value(self):
         plotted_values = []
         for i in range(len(self.df_values)):
@@ -351,20 +379,11 @@ class _BarChartRace(CommonChart):
             ax.barh(bar_location, bar_length, tick_label=cols, 
                     color=colors, **self.bar_kwargs)
             ax.set_yticklabels(ax.get_yticklabels(), **self.tick_label_font)
-            if not self.fixed_max and self.bar_textposition == 'outside':
-                max_bar = bar_length.max()
-                new_max_pixels = ax.transData.transform((max_bar, 0))[0] + self.extra_pixels
-                new_xmax = ax.transData.inverted().transform((new_max_pixels, 0))[0]
-                ax.set_xlim(ax.get_xlim()[0], new_xmax)
         else:
             ax.bar(bar_location, bar_length, tick_label=cols, 
                    color=colors, **self.bar_kwargs)
             ax.set_xticklabels(ax.get_xticklabels(), **self.tick_label_font)
-            if not self.fixed_max and self.bar_textposition == 'outside':
-                max_bar = bar_length.max()
-                new_max_pixels = ax.transData.transform((0, max_bar))[1] + self.extra_pixels
-                new_ymax = ax.transData.inverted().transform((0, new_max_pixels))[1]
-                ax.set_ylim(ax.get_ylim()[0], new_ymax)
+        self.extend_value_limit(ax, bar_length)
 
         self.set_major_formatter(ax)
         self.add_period_label(ax, i)
@@ -372,16 +391,65 @@ class _BarChartRace(CommonChart):
         self.add_bar_labels(ax, bar_location, bar_length)
         self.add_perpendicular_bar(ax, bar_length, i)
 
+    def update_axes(self, ax, i):
+        """
+        Change the data and view limits of the axes for row `i` as 
+        `plot_bars` does, without adding any artist, and return the bar info.
+        """
+        bar_location, bar_length, cols, colors = self.get_bar_info(i)
+        half = self.bar_size / 2
+        # the corners of the bars, which autoscale the axes when drawn
+        lengths = np.append(np.zeros_like(bar_length), bar_length)
+        locations = np.append(bar_location - half, bar_location + half)
+        if self.orientation == 'h':
+            ax.update_datalim(np.column_stack((lengths, locations)))
+            axis = ax.yaxis
+        else:
+            ax.update_datalim(np.column_stack((locations, lengths)))
+            axis = ax.xaxis
+        ax.autoscale_view()
+        if len(bar_location):
+            # setting the ticks at the bars widens the axis to show them all
+            axis.set_view_interval(bar_location.min(), bar_location.max())
+        self.extend_value_limit(ax, bar_length)
+        return bar_location, bar_length, cols, colors
+
+    def extend_value_limit(self, ax, bar_length):
+        # leave room for the bar labels outside the longest bar
+        if self.fixed_max or self.bar_textposition != 'outside':
+            return
+        max_bar = bar_length.max()
+        if self.orientation == 'h':
+            new_max_pixels = ax.transData.transform((max_bar, 0))[0] + self.extra_pixels
+            new_xmax = ax.transData.inverted().transform((new_max_pixels, 0))[0]
+            ax.set_xlim(ax.get_xlim()[0], new_xmax)
+        else:
+            new_max_pixels = ax.transData.transform((0, max_bar))[1] + self.extra_pixels
+            new_ymax = ax.transData.inverted().transform((0, new_max_pixels))[1]
+            ax.set_ylim(ax.get_ylim()[0], new_ymax)
+
+    def get_period_label_text(self, i):
+        if self.period_template:
+            idx_val = self.df_values.index[i]
+            if self.df_values.index.dtype.kind == 'M':
+                return idx_val.strftime(self.period_template)
+            return self.period_template.format(x=idx_val)
+        return self.str_index[i]
+
+    def get_frame_fingerprints(self):
+        # bars, their labels, the summary and the perpendicular bar only 
+        # depend on the values and ranks of the row, the rest on the label
+        values = self.df_values.to_numpy(float)
+        ranks = self.df_ranks.to_numpy(float)
+        fingerprints = []
+        for i in range(len(values)):
+            label = self.get_period_label_text(i) if self.period_label else ''
+            fingerprints.append((values[i].tobytes(), ranks[i].tobytes(), label))
+        return fingerprints
+
     def add_period_label(self, ax, i):
         if self.period_label:
-            if self.period_template:
-                idx_val = self.df_values.index[i]
-                if self.df_values.index.dtype.kind == 'M':
-                    s = idx_val.strftime(self.period_template)
-                else:
-                    s = self.period_template.format(x=idx_val)
-            else:
-                s = self.str_index[i]
+            s = self.get_period_label_text(i)
 
             if len(ax.texts) == 0:
                 # first frame
@@ -389,43 +457,52 @@ class _BarChartRace(CommonChart):
             else:
                 ax.texts[0].set_text(s)
 
+    def get_period_summary(self, i):
+        values = self.df_values.iloc[i]
+        ranks = self.df_ranks.iloc[i]
+        text_dict = self.period_summary_func(values, ranks)
+        if 'x' not in text_dict or 'y' not in text_dict or 's' not in text_dict:
+            name = self.period_summary_func.__name__
+            raise ValueError(f'The dictionary returned from `{name}` must contain '
+                              '"x", "y", and "s"')
+        return text_dict
+
     def add_period_summary(self, ax, i):
         if self.period_summary_func:
-            values = self.df_values.iloc[i]
-            ranks = self.df_ranks.iloc[i]
-            text_dict = self.period_summary_func(values, ranks)
-            if 'x' not in text_dict or 'y' not in text_dict or 's' not in text_dict:
-                name = self.period_summary_func.__name__
-                raise ValueError(f'The dictionary returned from `{name}` must contain '
-                                  '"x", "y", and "s"')
-            ax.text(transform=ax.transAxes, **text_dict)
+            ax.text(transform=ax.transAxes, **self.get_period_summary(i))
 
-    def add_bar_labels(self, ax, bar_location, bar_length):
-        if self.bar_textposition:
-            if self.orientation == 'h':
-                zipped = zip(bar_length, bar_location)
-            else:
-                zipped = zip(bar_location, bar_length)
+    def get_bar_labels(self, ax, bar_location, bar_length):
+        # position in data coordinates and text of the label of each bar
+        if self.orientation == 'h':
+            zipped = zip(bar_length, bar_location)
+        else:
+            zipped = zip(bar_location, bar_length)
 
-            delta = .01 if self.bar_textposition == 'outside' else -.01
+        delta = .01 if self.bar_textposition == 'outside' else -.01
 
-            text_objs = []
-            for x1, y1 in zipped:
-                xtext, ytext = ax.transLimits.transform((x1, y1))
-                if self.orientation == 'h':
-                    xtext += delta
-                    val = x1
-                else:
-                    ytext += delta
-                    val = y1
+        labels = []
+        for x1, y1 in zipped:
+            xtext, ytext = ax.transLimits.transform((x1, y1))
+            if self.orientation == 'h':
+                xtext += delta
+                val = x1
+            else:
+                ytext += delta
+                val = y1
 
-                if callable(self.bar_texttemplate):
-                    text = self.bar_texttemplate(val)
-                else:
-                    text = self.bar_texttemplate.format(x=val)
+            if callable(self.bar_texttemplate):
+                text = self.bar_texttemplate(val)
+            else:
+                text = self.bar_texttemplate.format(x=val)
 
-                xtext, ytext = ax.transLimits.inverted().transform((xtext, ytext))
+            xtext, ytext = ax.transLimits.inverted().transform((xtext, ytext))
+            labels.append((xtext, ytext, text))
+        return labels
 
+    def add_bar_labels(self, ax, bar_location, bar_length):
+        if self.bar_textposition:
+            text_objs = []
+            for xtext, ytext, text in self.get_bar_labels(ax, bar_location, bar_length):
                 text_obj = ax.text(xtext, ytext, text, clip_on=True, **self.bar_label_font)
                 text_objs.append(text_obj)
             return text_objs
@@ -454,6 +531,9 @@ class _BarChartRace(CommonChart):
     def anim_func(self, i):
         if i is None:
             return
+        if self.raster is not None:
+            self.draw_raster(i)
+            return
         ax = self.fig.axes[0]
         for bar in ax.containers:
             bar.remove()
@@ -462,51 +542,121 @@ class _BarChartRace(CommonChart):
             text.remove()
         self.plot_bars(ax, i)
         
-    def make_animation(self):
-        def init_func():
-            ax = self.fig.axes[0]
-            self.plot_bars(ax, 0)
-
-        interval = self.period_length / self.steps_per_period
-        pause = int(self.end_period_pause // interval)
-
-        def frame_generator(n):
-            frames = []
-            for i in range(n):
-                frames.append(i)
-                if pause and i % self.steps_per_period == 0 and i != 0 and i != n - 1:
-                    for _ in range(pause):
-                        frames.append(None)
-            return frames
-        
-        frames = frame_generator(len(self.df_values))
-        anim = FuncAnimation(self.fig, self.anim_func, frames, init_func, interval=interval)
-
-        try:
-            fc = self.fig.get_facecolor()
-            if fc == (1, 1, 1, 0):
-                fc = 'white'
-            savefig_kwargs = {'facecolor': fc}
-            if self.html:
-                ret_val = anim.to_html5_video(savefig_kwargs=savefig_kwargs)
-                try:
-                    from IPython.display import HTML
-                    ret_val = HTML(ret_val)
-                except ImportError:
-                    pass
-            else:
-                fc = self.fig.get_facecolor()
-                if fc == (1, 1, 1, 0):
-                    fc = 'white'
-                ret_val = anim.save(self.filename, fps=self.fps, writer=self.writer, 
-                                    savefig_kwargs=savefig_kwargs) 
-        except Exception as e:
-            message = str(e)
-            raise Exception(message)
-        finally:
-            plt.rcParams = self.orig_rcParams
+    def init_func(self):
+        ax = self.fig.axes[0]
+        self.plot_bars(ax, 0)
+        # the value axis grows with the rows drawn before a slice of the race
+        for i in self.rows_before_start:
+            self.update_axes(ax, i)
+        if self.backend == 'raster':
+            self.init_raster(ax)
+
+    def init_raster(self, ax):
+        """
+        Render the figure without its bars, texts, grid and tick labels 
+        as the background of the raster frames and stop drawing the axes. 
+        It is still updated as the race goes on, so that its limits, ticks 
+        and period label stay the same as when drawn by matplotlib, and 
+        gives the positions and styles of what `draw_raster` draws.
+        """
+        if self.raster is not None:
+            # drawn again from the start
+            self.raster.remove()
+            ax.set_visible(True)
+        start = int(bool(self.period_label))
+        for text in ax.texts[start:]:
+            text.remove()
+        # the bars of row 0 stay hidden, making the value axis autoscale 
+        # from 0 as with the bars drawn
+        self.raster_bars = ax.containers[-1]
+        hidden = [ax.xaxis, ax.yaxis, *ax.patches, *ax.texts, *ax.lines]
+        for artist in hidden:
+            artist.set_visible(False)
+        background = grab_buffer(self.fig, facecolor=self.get_savefig_facecolor())
+        for artist in hidden[2:]:
+            artist.set_visible(True)
+        ax.set_visible(False)
+
+        self.raster = RasterFrame(background)
+        self.fig.add_artist(self.raster)
+        self.bar_label_text = Text(**self.bar_label_font)
+        self.tick_label_text = ax.get_yticklabels()[0]
+        self.value_tick = ax.xaxis.get_major_ticks()[0]
+        texts = [self.bar_label_text, self.tick_label_text, self.value_tick.label1, *ax.texts]
+        if any(text.get_rotation() != 0 for text in texts):
+            raise ValueError('`backend="raster"` only draws text that is not rotated')
+
+    def draw_raster(self, i):
+        """
+        Update the axes for row `i` as `plot_bars` would, without adding 
+        any artist, and draw the frame into the raster buffer.
+        """
+        ax = self.fig.axes[0]
+        bar_location, bar_length, cols, colors = self.update_axes(ax, i)
+        half = self.bar_size / 2
+        self.add_period_label(ax, i)
+        self.add_perpendicular_bar(ax, bar_length, i)
 
-        return ret_val
+        raster = self.raster
+        raster.reset()
+        buf, dpi = raster.buf, self.fig.dpi
+        height = buf.shape[0]
+        clip = get_clip(ax.bbox, height)
+        trans = ax.transData
+
+        for line in ax.lines:
+            lw = line.get_linewidth() * dpi / 72
+            x = trans.transform((line.get_xdata()[0], 0))[0]
+            draw_vline(buf, x, lw, to_rgba_array(line.get_color(), line.get_alpha())[0], clip)
+
+        # the grid and labels of the value axis
+        vmin, vmax = sorted(ax.get_xlim())
+        locs = ax.xaxis.get_major_locator()()
+        eps = (vmax - vmin) * 1e-10
+        locs = [loc for loc in locs if vmin - eps <= loc <= vmax + eps]
+        gridline = self.value_tick.gridline
+        grid_color = to_rgba_array(gridline.get_color(), gridline.get_alpha())[0]
+        grid_lw = gridline.get_linewidth() * dpi / 72
+        for loc in locs:
+            draw_vline(buf, trans.transform((loc, 0))[0], grid_lw, grid_color, clip)
+
+        bar = self.raster_bars[0]
+        edgecolor, lw = bar.get_edgecolor(), bar.get_linewidth() * dpi / 72
+        facecolors = to_rgba_array(colors, self.bar_kwargs['alpha'])
+        x0 = trans.transform((0, 0))[0]
+        for loc, length, facecolor in zip(bar_location, bar_length, facecolors):
+            (x1, y0), (_, y1) = trans.transform([(length, loc - half), (length, loc + half)])
+            box = x0, x1, height - y1, height - y0
+            draw_rect(buf, box, facecolor, edgecolor, lw, clip)
+
+        if self.bar_textposition:
+            for xtext, ytext, text in self.get_bar_labels(ax, bar_location, bar_length):
+                x, y = trans.transform((xtext, ytext))
+                draw_text(buf, self.bar_label_text, text, x, y, dpi, clip)
+
+        # tick labels are looked up by location, so tied bars share the last label
+        tick_labels = dict(zip(bar_location, cols))
+        label_trans = self.tick_label_text.get_transform()
+        for loc in bar_location:
+            x, y = label_trans.transform((0, loc))
+            draw_text(buf, self.tick_label_text, str(tick_labels[loc]), x, y, dpi)
+
+        label = self.value_tick.label1
+        label_trans = label.get_transform()
+        for loc, text in zip(locs, ax.xaxis.get_major_formatter().format_ticks(locs)):
+            x, y = label_trans.transform((loc, 0))
+            draw_text(buf, label, text, x, y, dpi)
+
+        if self.period_label:
+            text = ax.texts[0]
+            x, y = text.get_transform().transform(text.get_position())
+            draw_text(buf, text, text.get_text(), x, y, dpi)
+
+        if self.period_summary_func:
+            text_dict = dict(self.get_period_summary(i))
+            x, y = ax.transAxes.transform((text_dict.pop('x'), text_dict.pop('y')))
+            text = Text(text=text_dict.pop('s'), **text_dict)
+            draw_text(buf, text, text.get_text(), x, y, dpi)
 
 
 def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None, 
@@ -517,7 +667,9 @@ def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None,
                    bar_textposition='outside', bar_texttemplate='{x:,.0f}',
                    bar_label_font=None, tick_label_font=None, tick_template='{x:,.0f}',
                    shared_fontdict=None, scale='linear', fig=None, writer=None, 
-                   bar_kwargs=None,  fig_kwargs=None, filter_column_colors=False):
+                   bar_kwargs=None,  fig_kwargs=None, filter_column_colors=False, 
+                   output=None, step_budget=None, frame_range=None, period_range=None, 
+                   checkpoint_dir=None, backend='matplotlib'):
     '''
     Create an animated bar chart race using matplotlib. Data must be in 
     'wide' format where each row represents a single time period and each 
@@ -528,8 +680,8 @@ def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None,
     If no `filename` is given, an HTML string is returned, otherwise the 
     animation is saved to disk.
 
-    You must have ffmpeg installed on your machine to save videos to disk
-    and ImageMagick to save animated gifs. Read more here:
+    You must have ffmpeg installed on your machine to save videos to disk.
+    Animated gifs are written without any external programs. Read more here:
     https://www.dexplo.org/bar_chart_race/installation/
 
     Parameters
@@ -540,10 +692,26 @@ def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None,
         category. Optionally, use the index to label each time period.
         The index can be of any type.
 
-    filename : `None` or str, default None
+    filename : `None`, str or list of str, default None
         If `None` return animation as an HTML5 string. If a string, save 
-        animation to that filename location. Use .mp4, .gif, .html, .mpeg, 
-        .mov or any other extensions supported by ffmpeg or ImageMagick.
+        animation to that filename location. Use .mp4, .gif, .webp, .png
+        (animated PNG), .html, .mpeg, .mov or any other extensions supported 
+        by ffmpeg or ImageMagick.
+
+        Use a pattern such as 'frames/%05d.png' to write each frame to its 
+        own PNG file along with a 'manifest.json' file listing the period 
+        and start time of each frame. Pass 
+        `bar_chart_racer.FrameSequenceWriter(skip_existing=True)` as the 
+        `writer` to skip frames that already exist. A '%' not followed by 
+        digits and 'd', as in 'growth_5%.png', is part of the name.
+
+        Give a list of filenames, such as ['race.mp4', 'race.gif'], to save 
+        the animation to all of them while drawing each frame only once. 
+        The frames are passed to the encoders of the different files at 
+        the same time, each on its own thread. Every file gets the whole 
+        animation, so a '.png' filename such as 'poster.png' is always 
+        saved as an animated PNG rather than a single still frame. Take one 
+        of the frames yielded with `output='frames'` to save a still image.
 
     orientation : 'h' or 'v', default 'h'
         Bar orientation - horizontal or vertical
@@ -597,6 +765,13 @@ def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None,
         end_period_pause to 725 will produce a pause of 700 
         milliseconds when using the defaults.
 
+        The figure is not drawn again during a pause. GIF, WebP and PNG 
+        files store it as one longer frame and other formats repeat the 
+        last frame drawn, except with writers that only save frames 
+        themselves, such as 'pillow', 'imagemagick' and 'html'. The video 
+        embedded when `filename` is None repeats it too, unless 
+        `animation.writer` in matplotlib's rcParams is not 'ffmpeg'.
+
     interpolate_period : bool, default `False`
         Whether to interpolate the period. Only valid for datetime or
         numeric indexes. When set to `True`, for example, 
@@ -764,9 +939,28 @@ def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None,
     writer : str or matplotlib Writer instance
         This argument is passed to the matplotlib FuncAnimation.save method.
 
-        By default, the writer will be 'ffmpeg' unless creating a gif,
-        then it will be 'imagemagick', or an html file, then it 
-        will be 'html'. 
+        By default, the writer will be 'ffmpeg' unless creating a gif 
+        or an html file. Gifs are written in-process with a global palette 
+        built from the bar and text colors, storing only the part of each 
+        frame that changed. Use 'imagemagick' or 'pillow' to use those 
+        writers instead. Animated WebP and PNG files are also written 
+        in-process the same way, compressing frames on a thread pool. 
+        Html files use the 'html' writer.
+
+        With ffmpeg and the in-process writers, frames are encoded on a 
+        separate thread while the next ones are drawn. At most 8 drawn 
+        frames wait to be encoded. Pass 
+        `bar_chart_racer.PipelinedWriter(writer, queue_size)` to change 
+        that limit.
+
+        When `filename` is a list, give `None` or a list with one writer 
+        (or `None` for the default) for each filename.
+
+        Use `bar_chart_racer.ResizeWriter(scale=.5)` to save a smaller 
+        copy, for instance next to the full size one in a list, shrinking 
+        the frames already drawn instead of drawing them again. Give it a 
+        `dpi` instead of a `scale` to rasterize that output again at 
+        that resolution, keeping small text crisp.
             
         Find all of the availabe Writers:
         >>> from matplotlib import animation
@@ -816,10 +1010,88 @@ def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None,
         This parameter is experimental and may be changed/removed
         in a later version.
 
+    output : None, 'frames', 'html' or file-like object, default None
+        Use a file-like object opened in binary mode, such as `io.BytesIO`, 
+        to write the animation to it instead of to disk. The format is 
+        taken from the extension of `filename`, which must be given but 
+        is not written to. Videos are streamed from the stdout of ffmpeg, 
+        with mp4 and mov written as fragmented files. `writer` must then be 
+        None, 'ffmpeg' or one of the writers of this package, as the other 
+        matplotlib writers need a path.
+
+        Use 'html' to save the animation to `filename` and return a small
+        HTML `<video>` tag, or `<img>` tag for gif, webp and png, that 
+        references the file instead of embedding it. The file is linked 
+        by `filename` as given, so use a path relative to the notebook.
+
+        Use 'frames' to return a generator instead of saving the animation.
+        It draws each frame as it is iterated and yields a tuple of the 
+        frame number, the period label and the frame as an (H, W, 4) uint8 
+        RGBA array read directly from the canvas. `filename` and `writer` 
+        are ignored.
+
+        Example:
+        >>> for i, period, frame in bar_chart_race(df, output='frames'):
+        ...     my_encoder.write(frame)
+
+    step_budget : int, default None
+        Total number of steps shared out between all the periods according 
+        to how much happens in each, instead of using `steps_per_period` 
+        for every period. Periods where bars swap ranks or move a lot 
+        get more steps, up to `steps_per_period`, and quiet periods as few 
+        as one. Each period still lasts `period_length`, as every frame 
+        is shown until the next one drawn is due. GIF, WebP and PNG files 
+        store frames of varying length and other formats repeat the last 
+        frame drawn without drawing it again.
+
+    frame_range : tuple of (start, stop), default None
+        Only draw and save the frames from `start` up to, but not 
+        including, `stop`, counting every frame of the whole race 
+        including those of pauses. Either value may be None or negative, 
+        as in a slice. Each frame looks the same as in a render of the 
+        whole race, and each range is saved as a file that plays on its own. 
+        Use it to preview part of a race or to split a long race between 
+        several processes or machines.
+
+    period_range : tuple of (start, stop), default None
+        Same as `frame_range`, with `start` and `stop` given as positions 
+        of the periods (rows of `df`). The range ends just before period 
+        `stop` is reached, so consecutive ranges such as (0, 10) and 
+        (10, None) cover the race exactly once.
+
+    checkpoint_dir : str, default None
+        Directory where the video is saved in chunks of about 1,000 frames 
+        before they are joined into `filename` without encoding them again. 
+        The chunks are named after a hash of the prepared data and the 
+        parameters. When a render stops before it is done, calling this 
+        function again with the same arguments keeps the chunks already 
+        saved and resumes with the first one missing, setting up the bars 
+        directly at its first frame. Only valid when saving a single video 
+        ending in '.mp4', '.m4v', '.mov' or '.mkv'.
+
+    backend : 'matplotlib' or 'raster', default 'matplotlib'
+        With 'raster', each frame is drawn directly into an array of pixels 
+        instead of by matplotlib. The figure with its title and axes 
+        background is rendered once, then the bars, grid lines and text are 
+        blended into a copy of it, with the text rendered by the same font 
+        engine and placed at the same pixels as matplotlib. Frames take 
+        about half as long to draw and look nearly identical. Only horizontal 
+        bars with a linear `scale` and text that is not rotated can be 
+        drawn, hatches and dashed edges of `bar_kwargs` are ignored, and 
+        the figure must be saved at its own dpi.
+
     Returns
     -------
     When `filename` is left as `None`, an HTML5 video is returned as a string.
     Otherwise, a file of the animation is saved and `None` is returned.
+    With a file-like `output`, the animation is written to it and `None` 
+    is returned. With `output='html'`, an HTML tag referencing the saved 
+    file is returned. With `output='frames'`, a generator of frames is 
+    returned.
+
+    Frames showing the same values, ranks and period label as the frame 
+    before them repeat it without being drawn again. Their number is given 
+    in a UserWarning once all frames are saved.
 
     Examples
     --------
@@ -872,5 +1144,10 @@ def bar_chart_race(df, filename=None, orientation='h', sort='desc', n_bars=None,
                         period_label, period_template, period_summary_func, perpendicular_bar_func,
                         colors, title, bar_size, bar_textposition, bar_texttemplate, 
                         bar_label_font, tick_label_font, tick_template, shared_fontdict, scale, 
-                        fig, writer, bar_kwargs, fig_kwargs, filter_column_colors)
+                        fig, writer, bar_kwargs, fig_kwargs, filter_column_colors, output, 
+                        step_budget, frame_range, period_range, checkpoint_dir, backend)
+    if output == 'frames':
+        return bcr.iter_frames()
+    if checkpoint_dir is not None:
+        return bcr.save_checkpoints()
     return bcr.make_animation()
@@ -1,11 +1,106 @@
+import io
+import json
 import warnings
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly
+from plotly.io.json import to_json_plotly
+
+from ._utils import prepare_wide_data, hash_content, is_file_like
+
+
+# Appended to the figure with `post_script`. Deferred frames are kept in
+# `chunks` and added with Plotly.addFrames shortly before playback reaches
+# them. Since an animation only plays the frames known when it starts,
+# playback is resumed from the last played frame whenever new frames arrive.
+LAZY_FRAMES_SCRIPT = '''
+var gd = document.getElementById('{plot_id}');
+var chunks = %(chunks)s;
+var mode = %(mode)s;
+var chunkSize = %(chunk_size)d;
+var nFrames = %(n_frames)d;
+var playOpts = %(play_opts)s;
+var nLoaded = %(n_inline)d;
+var nextChunk = 0;
+var loading = null;
+var lastFrame = 0;
+var interrupted = false;
+
+function loadChunk() {
+    if (loading) {
+        return loading;
+    }
+    if (nextChunk >= chunks.length) {
+        return Promise.resolve();
+    }
+    var chunk = chunks[nextChunk];
+    var frames;
+    if (mode === 'blob') {
+        frames = Promise.resolve(JSON.parse(chunk));
+    } else {
+        frames = fetch(chunk).then(function(response) {return response.json();});
+    }
+    loading = frames.then(function(frameList) {
+        return Plotly.addFrames(gd, frameList).then(function() {
+            nextChunk += 1;
+            nLoaded += frameList.length;
+            loading = null;
+        });
+    });
+    return loading;
+}
+
+function loadUntil(i) {
+    if (i < nLoaded || nextChunk >= chunks.length) {
+        return Promise.resolve();
+    }
+    return loadChunk().then(function() {return loadUntil(i);});
+}
+
+function frameNames(start) {
+    var names = [];
+    for (var i = start; i < nLoaded; i++) {
+        names.push(String(i));
+    }
+    return names;
+}
+
+gd.on('plotly_animatingframe', function(e) {
+    lastFrame = Number(e.name);
+    interrupted = false;
+    if (nLoaded - lastFrame <= chunkSize / 2) {
+        loadChunk();
+    }
+});
+
+gd.on('plotly_animationinterrupted', function() {
+    interrupted = true;
+});
+
+gd.on('plotly_animated', function() {
+    if (interrupted || lastFrame >= nFrames - 1) {
+        return;
+    }
+    loadUntil(lastFrame + 1).then(function() {
+        var names = frameNames(lastFrame + 1);
+        if (names.length) {
+            Plotly.animate(gd, names, playOpts);
+        }
+    });
+});
 
-from ._utils import prepare_wide_data
+gd.on('plotly_sliderchange', function(e) {
+    var name = Number(e.step.args[0][0]);
+    if (name >= nLoaded) {
+        loadUntil(name).then(function() {
+            Plotly.animate(gd, [String(name)], e.step.args[1]);
+        });
+    }
+});
+'''
 
 
 class _BarChartRace:
@@ -15,8 +110,12 @@ class _BarChartRace:
                  period_label, period_template, period_summary_func, perpendicular_bar_func, 
                  colors, title, bar_size, bar_textposition, bar_texttemplate, bar_label_font, 
                  tick_label_font, hovertemplate, slider, scale, bar_kwargs, layout_kwargs, 
-                 write_html_kwargs, filter_column_colors):
+                 write_html_kwargs, filter_column_colors, lazy_frames, content_hash, output):
+        # hash the parameters before any of them are modified below
+        params = {k: v for k, v in locals().items() 
+                  if k not in ('self', 'df', 'filename', 'content_hash', 'output')}
         self.filename = filename
+        self.output = output
         self.extension = self.get_extension()
         self.orientation = orientation
         self.sort = sort
@@ -43,6 +142,9 @@ class _BarChartRace:
         self.duration = self.period_length / steps_per_period
         self.write_html_kwargs = write_html_kwargs or {}
         self.filter_column_colors = filter_column_colors
+        self.lazy_frames = self.get_lazy_frames(lazy_frames)
+        self.content_hash = content_hash
+        self.digest = self.get_digest(df, params)
         
         self.validate_params()
         self.bar_kwargs = self.get_bar_kwargs(bar_kwargs)
@@ -75,6 +177,73 @@ class _BarChartRace:
         if self.orientation not in ('h', 'v'):
             raise ValueError('`orientation` must be "h" or "v"')
 
+        if self.output is not None:
+            if not is_file_like(self.output):
+                raise TypeError('`output` must be None or a file-like object')
+            if self.content_hash:
+                raise ValueError('`content_hash` cannot be used with a file-like `output`')
+            if self.lazy_frames and self.lazy_frames['mode'] == 'files':
+                raise ValueError('The "files" mode of `lazy_frames` cannot be used with '
+                                 'a file-like `output`')
+        elif self.lazy_frames and self.filename is None:
+            raise ValueError('`lazy_frames` can only be used when saving to a file with '
+                             '`filename` or to `output`')
+
+    def get_digest(self, df, params):
+        if self.filename is None and self.output is None:
+            return
+        params['plotly_version'] = plotly.__version__
+        if self.lazy_frames and self.lazy_frames['mode'] == 'files':
+            # chunk files are referenced by name from within the HTML
+            params['filename'] = Path(self.filename).name
+        return hash_content(df, params)
+
+    def get_hash_comment(self):
+        return f'<!-- bar_chart_racer content-hash: {self.digest} -->'
+
+    def is_up_to_date(self):
+        if not self.content_hash:
+            return False
+        try:
+            with open(self.filename, encoding='utf-8') as f:
+                first_line = f.readline()
+        except FileNotFoundError:
+            return False
+        if first_line.strip() != self.get_hash_comment():
+            return False
+        if self.lazy_frames and self.lazy_frames['mode'] == 'files':
+            # the page is broken by any missing chunk of frames
+            n_lazy = max(0, len(self.df_values) - self.lazy_frames['inline'])
+            return all(path.exists() for path in self.get_chunk_paths(n_lazy))
+        return True
+
+    def get_chunk_paths(self, n_lazy):
+        # files of the frames loaded by the page in 'files' mode
+        path = Path(self.filename)
+        n_chunks = -(-n_lazy // self.lazy_frames['chunk_size'])
+        return [path.with_name(f'{path.stem}_frames_{k}.json') for k in range(n_chunks)]
+
+    def get_lazy_frames(self, lazy_frames):
+        if lazy_frames is None or lazy_frames is False:
+            return
+
+        default_lazy_frames = {'inline': 50, 'chunk_size': 200, 'mode': 'blob'}
+        if lazy_frames is True:
+            return default_lazy_frames
+        elif isinstance(lazy_frames, int):
+            lazy_frames = {**default_lazy_frames, 'inline': lazy_frames}
+        elif isinstance(lazy_frames, dict):
+            lazy_frames = {**default_lazy_frames, **lazy_frames}
+        else:
+            raise TypeError('`lazy_frames` must be a boolean, integer, or dictionary')
+
+        if lazy_frames['mode'] not in ('blob', 'files'):
+            raise ValueError('The "mode" of `lazy_frames` must be "blob" or "files"')
+        if lazy_frames['inline'] < 2 or lazy_frames['chunk_size'] < 1:
+            raise ValueError('`lazy_frames` must write at least 2 frames inline and use '
+                             'a chunk size of at least 1')
+        return lazy_frames
+
     def get_bar_kwargs(self, bar_kwargs):
         if bar_kwargs is None:
             return {'opacity': .8}
@@ -273,6 +442,9 @@ class _BarChartRace:
     def get_frames(self):
         frames = []
         slider_steps = []
+        # tiny offset, unique to each column, so that identical output is produced each time
+        n_cols = self.df_values.shape[1]
+        tie_breaker = np.arange(n_cols) / (10_000 * n_cols)
         for i in range(len(self.df_values)):
             bar_locs = self.df_ranks.iloc[i].values
             top_filt = (bar_locs >= 0) & (bar_locs < self.n_bars + 1)
@@ -284,7 +456,7 @@ class _BarChartRace:
             cols = self.df_values.columns.values.copy()
             cols[bar_locs == 0] = ' '
             colors = self.bar_colors
-            bar_locs = bar_locs + np.random.rand(len(bar_locs)) / 10_000 # done to prevent stacking of bars
+            bar_locs = bar_locs + tie_breaker # done to prevent stacking of bars
             x, y = (bar_vals, bar_locs) if self.orientation == 'h' else (bar_locs, bar_vals)
 
             label_axis = dict(tickmode='array', tickvals=bar_locs, ticktext=cols, 
@@ -380,6 +552,8 @@ class _BarChartRace:
                     fillcolor="#444444",layer="below", opacity=.5, line_width=0)
 
     def make_animation(self):
+        if self.is_up_to_date():
+            return
         frames, slider_steps = self.get_frames()
         data = frames[0].data
         layout = frames[0].layout
@@ -425,12 +599,66 @@ class _BarChartRace:
         if self.slider:
             layout.sliders = [sliders_dict]
 
+        if self.lazy_frames:
+            n_inline = self.lazy_frames['inline']
+            fig = go.Figure(data=data, layout=layout, frames=frames[1:n_inline])
+            play_opts = layout.updatemenus[0].buttons[0].args[1]
+            self.write_lazy_html(fig, frames[n_inline:], play_opts)
+            return
+
         fig = go.Figure(data=data, layout=layout, frames=frames[1:])
-        if self.filename:
-            fig.write_html(self.filename, **self.write_html_kwargs)
+        if self.filename or self.output is not None:
+            self.write_html(fig, self.write_html_kwargs)
         else:
             return fig
 
+    def write_html(self, fig, write_html_kwargs):
+        # a div id derived from the content replaces plotly's random uuid
+        write_html_kwargs = {'div_id': f'bcr-{self.digest[:16]}', **write_html_kwargs}
+        if self.output is not None:
+            html = fig.to_html(**write_html_kwargs)
+            if not isinstance(self.output, io.TextIOBase):
+                html = html.encode('utf-8')
+            self.output.write(html)
+        elif self.content_hash:
+            with open(self.filename, 'w', encoding='utf-8') as f:
+                f.write(self.get_hash_comment() + '\n')
+                fig.write_html(f, **write_html_kwargs)
+        else:
+            fig.write_html(self.filename, **write_html_kwargs)
+
+    def write_lazy_html(self, fig, lazy_frames, play_opts):
+        chunk_size = self.lazy_frames['chunk_size']
+        mode = self.lazy_frames['mode']
+        chunks = []
+        if mode == 'files':
+            chunk_paths = self.get_chunk_paths(len(lazy_frames))
+        for k, start in enumerate(range(0, len(lazy_frames), chunk_size)):
+            frame_list = [frame.to_plotly_json() for frame in lazy_frames[start:start + chunk_size]]
+            chunk = to_json_plotly(frame_list)
+            if mode == 'blob':
+                chunks.append(chunk)
+            else:
+                chunk_paths[k].write_text(chunk)
+                chunks.append(chunk_paths[k].name)
+
+        n_frames = len(self.df_values)
+        script = LAZY_FRAMES_SCRIPT % {
+            # '</' is escaped so that no chunk can close the surrounding script tag
+            'chunks': json.dumps(chunks).replace('</', '<\\/'),
+            'mode': json.dumps(mode),
+            'chunk_size': chunk_size,
+            'n_frames': n_frames,
+            'n_inline': n_frames - len(lazy_frames),
+            'play_opts': json.dumps(play_opts),
+        }
+        write_html_kwargs = dict(self.write_html_kwargs)
+        post_script = write_html_kwargs.pop('post_script', None) or []
+        if isinstance(post_script, str):
+            post_script = [post_script]
+        write_html_kwargs['post_script'] = [script, *post_script]
+        self.write_html(fig, write_html_kwargs)
+
 
 def bar_chart_race_plotly(df, filename=None, orientation='h', sort='desc', n_bars=None, 
                           fixed_order=False, fixed_max=False, steps_per_period=10, 
@@ -440,7 +668,8 @@ def bar_chart_race_plotly(df, filename=None, orientation='h', sort='desc', n_bar
                           bar_textposition='outside', bar_texttemplate=None, bar_label_font=None, 
                           tick_label_font=None, hovertemplate=None, slider=True, scale='linear', 
                           bar_kwargs=None, layout_kwargs=None, write_html_kwargs=None, 
-                          filter_column_colors=False):
+                          filter_column_colors=False, lazy_frames=None, content_hash=False, 
+                          output=None):
     '''
     Create an animated bar chart race using Plotly. Data must be in 
     'wide' format where each row represents a single time period and each 
@@ -706,11 +935,48 @@ def bar_chart_race_plotly(df, filename=None, orientation='h', sort='desc', n_bar
         This parameter is experimental and may be changed/removed
         in a later version.
 
+    lazy_frames : bool, int, or dict, default None
+        Only valid when saving to an HTML file. Write only the first frames
+        into the figure and defer the rest. Deferred frames are added to the 
+        figure with `Plotly.addFrames` as playback approaches them, so the 
+        time until the first frame plays does not depend on the length 
+        of the race.
+
+        Use an integer for the number of frames written into the figure 
+        or `True` for the defaults. Use a dictionary for more control:
+        {
+            'inline': 50,
+            'chunk_size': 200,
+            'mode': 'blob'
+        }
+
+        * inline - number of frames written into the figure
+        * chunk_size - number of frames added at a time
+        * mode - 'blob' stores each chunk of frames as a string inside the
+          HTML that is only parsed when needed. 'files' writes each chunk to 
+          a separate JSON file next to the HTML file, named 
+          '<filename>_frames_<chunk>.json'. Browsers only fetch local files
+          when the HTML is served, not when opened directly from disk.
+
+    content_hash : bool, default False
+        Only valid when saving to a file. When `True`, a hash of `df` and 
+        all other parameters is written to the first line of the HTML file
+        and the file is not written again if it already contains the 
+        same hash. 
+        
+        Output is identical for identical inputs regardless of this 
+        parameter, unless a `div_id` is given in `write_html_kwargs`.
+
+    output : file-like object, default None
+        Write the HTML to this file-like object instead of to `filename`,
+        i.e. `io.BytesIO` or `io.StringIO`. Binary files receive UTF-8 
+        encoded bytes. `filename` is not needed.
+
     Returns
     -------
-    When `filename` is left as `None`, a plotly figure is returned and
-    embedded into the notebook. Otherwise, a file of the HTML is 
-    saved and `None` is returned.
+    When `filename` and `output` are left as `None`, a plotly figure is 
+    returned and embedded into the notebook. Otherwise, the HTML is 
+    written and `None` is returned.
 
     References
     -----
@@ -759,5 +1025,6 @@ def bar_chart_race_plotly(df, filename=None, orientation='h', sort='desc', n_bar
                         period_label, period_template, period_summary_func, perpendicular_bar_func, 
                         colors, title, bar_size, bar_textposition, bar_texttemplate, bar_label_font, 
                         tick_label_font, hovertemplate, slider, scale, bar_kwargs, layout_kwargs, 
-                        write_html_kwargs, filter_column_colors)
+                        write_html_kwargs, filter_column_colors, lazy_frames, content_hash, 
+                        output)
     return bcr.make_animation()
@@ -1,13 +1,42 @@
+import html
+import logging
+import os
+import warnings
+from pathlib import Path
+
+import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib import ticker
+from matplotlib import animation, ticker, colors as mcolors
+
+from ._func_animation import FuncAnimation
+from ._segments import SEGMENT_EXTENSIONS, concat_segments
+from ._utils import hash_content, is_file_like
+from ._writers import (APNGWriter, BufferWriter, FFMpegStreamWriter, FrameSequenceWriter, 
+                       GifWriter, PipelinedWriter, ResizeWriter, TeeWriter, WebPWriter, 
+                       grab_buffer, is_frame_pattern, supports_buffers)
+
+_log = logging.getLogger(__name__)
 
 
 class CommonChart:
+
+    # index of the first row drawn by anim_func
+    first_frame = 0
+
+    # position in the whole race of the first frame of the slice drawn
+    start_frame = 0
+    rows_before_start = ()
+
+    # approximate number of frames saved to each file of `checkpoint_dir`
+    checkpoint_frames = 1000
         
     def get_extension(self):
-        if self.filename:
+        if isinstance(self.filename, str):
             return self.filename.split('.')[-1]
 
+    def is_multi_output(self):
+        return isinstance(self.filename, (list, tuple))
+
     def get_title(self, title):
         if isinstance(title, str):
             return {'label': title}
@@ -51,15 +80,426 @@ class CommonChart:
         return orig_rcParams
 
     def get_writer(self, writer):
-        if writer is None:
-            if self.extension == 'gif':
-                writer = 'imagemagick'
-            elif self.extension == 'html':
+        if self.is_multi_output():
+            writers = [None] * len(self.filename) if writer is None else writer
+            if not isinstance(writers, (list, tuple)) or len(writers) != len(self.filename):
+                raise ValueError('`writer` must be None or a list with one writer for '
+                                 'each filename when saving to several files')
+            # each filename needs its own writer instance
+            writers = [self.create_writer(self.get_file_writer(writer, filename)) 
+                       for writer, filename in zip(writers, self.filename)]
+            return TeeWriter(writers)
+        return self.get_file_writer(writer, self.filename)
+
+    def create_writer(self, writer):
+        if isinstance(writer, str):
+            writer = animation.writers[writer](fps=self.fps)
+        return writer
+
+    def get_file_writer(self, writer, filename):
+        if is_file_like(self.output):
+            writer = self.get_stream_writer(writer, filename)
+        if isinstance(writer, ResizeWriter):
+            writer.writer = self.create_writer(self.get_file_writer(writer.writer, filename))
+        elif isinstance(writer, FrameSequenceWriter) and writer.fps is None:
+            # held frames are written as many times as the chart's frames they last
+            writer.fps = self.fps
+        elif writer is None:
+            extension = filename.split('.')[-1] if filename else None
+            if extension == 'png' and is_frame_pattern(filename):
+                writer = FrameSequenceWriter(self.fps)
+            elif extension == 'gif':
+                writer = GifWriter(self.fps, colors=self.get_palette_colors())
+            elif extension == 'webp':
+                writer = WebPWriter(self.fps)
+            elif extension == 'png':
+                writer = APNGWriter(self.fps)
+            elif extension == 'html':
                 writer = 'html'
+            elif is_file_like(self.output):
+                writer = FFMpegStreamWriter(extension, fps=self.fps)
             else:
                 writer = plt.rcParams['animation.writer']
         return writer
 
+    def get_stream_writer(self, writer, filename):
+        # matplotlib's own writers need a path to write to
+        if writer == 'ffmpeg':
+            return FFMpegStreamWriter(filename.split('.')[-1], fps=self.fps)
+        if (isinstance(writer, str) or isinstance(writer, animation.AbstractMovieWriter) 
+                and not isinstance(writer, (BufferWriter, FFMpegStreamWriter))):
+            raise ValueError(f'The writer {writer!r} cannot write to a file-like `output`, '
+                             "use 'ffmpeg', an FFMpegStreamWriter or leave `writer` as None")
+        return writer
+
+    def validate_filename(self):
+        if self.filename is None:
+            return
+        filenames = self.filename if self.is_multi_output() else [self.filename]
+        if not filenames:
+            raise ValueError('`filename` must contain at least one filename')
+        for filename in filenames:
+            if not isinstance(filename, str):
+                raise TypeError('`filename` must be None, a string or a list of strings')
+            if '.' not in filename:
+                raise ValueError('`filename` must have an extension')
+        if self.is_multi_output() and self.output not in (None, 'frames'):
+            raise ValueError('`output` must be None or "frames" when saving to several '
+                             'filenames')
+
+    def validate_output(self):
+        if is_file_like(self.output):
+            if self.filename is None:
+                raise ValueError('`filename` must be given with a file-like `output`, '
+                                 'its extension sets the format')
+            if self.extension == 'html':
+                raise ValueError('html animations cannot be written to a file-like `output`')
+        elif self.output == 'html':
+            if self.filename is None or self.extension == 'html' or is_frame_pattern(self.filename):
+                raise ValueError('`filename` must be given to save a video or image '
+                                 'when `output` is "html"')
+        elif self.output not in (None, 'frames'):
+            raise ValueError('`output` must be None, "frames", "html" or a file-like object')
+
+    def get_outfile(self):
+        return self.output if is_file_like(self.output) else self.filename
+
+    def get_html_tag(self):
+        # reference the saved file instead of embedding it
+        src = html.escape(Path(self.filename).as_posix())
+        width, height = (self.fig.get_size_inches() * self.fig.dpi).astype(int)
+        if self.extension in ('gif', 'webp', 'png'):
+            return f'<img src="{src}" width="{width}" height="{height}">'
+        return (f'<video src="{src}" width="{width}" height="{height}" controls autoplay loop>\n'
+                '  Your browser does not support the video tag.\n'
+                '</video>')
+
+    def get_pipelined_writer(self, writer):
+        # draw the next frames while a separate thread encodes the previous ones
+        if isinstance(writer, str) and animation.writers.is_available(writer):
+            writer_class = animation.writers[writer]
+            if (issubclass(writer_class, animation.MovieWriter) 
+                    and not issubclass(writer_class, animation.FileMovieWriter)):
+                writer = writer_class(fps=self.fps)
+        if supports_buffers(writer):
+            return PipelinedWriter(writer)
+        return writer
+
+    def set_writer_periods(self, frames):
+        writers = self.writer.writers if isinstance(self.writer, TeeWriter) else [self.writer]
+        for writer in writers:
+            if isinstance(writer, ResizeWriter):
+                writer = writer.writer
+            if isinstance(writer, FrameSequenceWriter) and writer.periods is None:
+                writer.periods = self.get_frame_periods(frames)
+
+    def validate_step_budget(self):
+        if self.step_budget is not None:
+            if not isinstance(self.step_budget, (int, np.integer)) or self.step_budget < 1:
+                raise ValueError('`step_budget` must be None or a positive integer')
+
+    def get_scheduled_rows(self, n_shown):
+        # rows drawn when the steps are shared out between the periods, all 
+        # other rows are held by repeating the row drawn before them
+        if self.step_budget is None:
+            return None
+        step = self.steps_per_period
+        steps = self.allocate_steps(self.get_period_activity(n_shown))
+        rows = {self.first_frame, len(self.df_values) - 1}
+        for period, n_steps in enumerate(steps):
+            rows.update(period * step + round(k * step / n_steps) for k in range(n_steps))
+        return rows
+
+    def get_period_activity(self, n_shown):
+        # distance travelled by the shown bars or lines from one period to 
+        # the next, in lengths of the longest of them plus rank positions
+        step = self.steps_per_period
+        values = self.df_values.to_numpy(float)[::step]
+        ranks = self.df_ranks.to_numpy(float)[::step]
+        shown = (ranks >= 1) & (ranks <= n_shown)
+        shown = shown[:-1] | shown[1:]
+        value_change = np.where(shown, np.abs(np.diff(values, axis=0)), 0)
+        largest = np.where(shown, np.fmax(np.abs(values[:-1]), np.abs(values[1:])), 0)
+        largest = np.nanmax(largest, axis=1, initial=0)
+        largest[~(largest > 0)] = 1
+        rank_change = np.where(shown, np.abs(np.diff(ranks, axis=0)), 0)
+        return np.nansum(value_change, axis=1) / largest + np.nansum(rank_change, axis=1)
+
+    def allocate_steps(self, activity):
+        # every period gets one step and the rest of the budget is handed 
+        # out in proportion to the activity, at most steps_per_period each
+        n_periods, max_steps = len(activity), self.steps_per_period
+        steps = np.ones(n_periods, dtype=int)
+        remaining = min(max(self.step_budget, n_periods), n_periods * max_steps) - n_periods
+        while remaining > 0:
+            room = steps < max_steps
+            weights = np.where(room, activity, 0)
+            if not weights.sum() > 0:
+                weights = room.astype(float)
+            share = weights / weights.sum() * remaining
+            add = np.minimum(share.astype(int), max_steps - steps)
+            if add.sum() == 0:
+                # fewer steps left than periods wanting one
+                order = [k for k in np.argsort(-share, kind='stable') if room[k]]
+                add[order[:remaining]] = 1
+            steps += add
+            remaining -= add.sum()
+        return steps
+
+    def get_frame_fingerprints(self):
+        # charts whose rows can look the same return what each row shows
+        return None
+
+    def get_race_frames(self):
+        # rows drawn by anim_func for the whole race, with None for each 
+        # frame of a pause, a row skipped by the step schedule or a row 
+        # looking the same as the last one drawn, and the row shown by each frame
+        interval = self.period_length / self.steps_per_period
+        pause = int(self.end_period_pause // interval)
+        n = len(self.df_values)
+        fingerprints = self.get_frame_fingerprints()
+        frames = []
+        rows = []
+        drawn = None
+        self.repeated_positions = []
+        for i in range(self.first_frame, n):
+            if self.scheduled_rows is not None and i not in self.scheduled_rows:
+                frames.append(None)
+            elif (fingerprints is not None and drawn is not None 
+                    and fingerprints[i] == fingerprints[drawn]):
+                self.repeated_positions.append(len(frames))
+                frames.append(None)
+            else:
+                frames.append(i)
+                drawn = i
+            rows.append(i)
+            if pause and i % self.steps_per_period == 0 and i != 0 and i != n - 1:
+                for _ in range(pause):
+                    frames.append(None)
+                    rows.append(i)
+        return frames, rows
+
+    def get_frames(self):
+        # rows drawn by anim_func for the slice of the race drawn
+        frames, rows = self.get_race_frames()
+        start, stop = self.get_frame_slice(rows)
+        # rows drawn before the slice, replayed to carry over the state of the axes
+        self.rows_before_start = [i for i in frames[:start] if i is not None]
+        self.n_repeated_frames = sum(start < k < stop for k in self.repeated_positions)
+        frames = frames[start:stop]
+        if frames[0] is None:
+            # a held first frame draws the row it holds
+            frames[0] = self.rows_before_start.pop()
+        self.start_frame = start
+        return frames
+
+    def warn_repeated_frames(self, n_frames):
+        # warned once all frames are saved, as few users set up logging
+        if self.n_repeated_frames:
+            warnings.warn(f'{self.n_repeated_frames} of {n_frames} frames look the same as '
+                          'the frame before them and were not drawn again')
+
+    def validate_ranges(self):
+        for name in ('frame_range', 'period_range'):
+            value = getattr(self, name)
+            if value is not None and (not isinstance(value, (list, tuple)) or len(value) != 2):
+                raise TypeError(f'`{name}` must be None or a tuple of (start, stop)')
+        if self.frame_range is not None and self.period_range is not None:
+            raise ValueError('Use only one of `frame_range` and `period_range`')
+
+    def get_frame_slice(self, rows):
+        # start and stop positions in the frame list, stop excluded
+        if self.frame_range is not None:
+            start, stop, _ = slice(*self.frame_range).indices(len(rows))
+        elif self.period_range is not None:
+            step = self.steps_per_period
+            n_periods = (len(self.df_values) - 1) // step + 1
+            first, last, _ = slice(*self.period_range).indices(n_periods)
+            start = np.searchsorted(rows, first * step)
+            stop = np.searchsorted(rows, last * step) if last < n_periods else len(rows)
+        else:
+            return 0, len(rows)
+        if start >= stop:
+            raise ValueError('`frame_range` or `period_range` does not contain any frames')
+        return int(start), int(stop)
+
+    def validate_checkpoint_dir(self):
+        if self.checkpoint_dir is None:
+            return
+        if (self.output is not None or self.is_multi_output() 
+                or self.extension not in SEGMENT_EXTENSIONS):
+            raise ValueError('`checkpoint_dir` can only be used to save a single video '
+                             f'file ending in one of {SEGMENT_EXTENSIONS}')
+
+    def get_checkpoint_bounds(self, frames):
+        # start and stop positions of the chunks, each starting on a frame drawn
+        starts = [0]
+        for k in range(self.checkpoint_frames, len(frames), self.checkpoint_frames):
+            while k < len(frames) and frames[k] is None:
+                k += 1
+            if starts[-1] < k < len(frames):
+                starts.append(k)
+        return list(zip(starts, starts[1:] + [len(frames)]))
+
+    def save_checkpoints(self):
+        '''
+        Save the animation as consecutive chunks of frames in 
+        `checkpoint_dir` and join them into `filename` once all are saved. 
+        The chunks are named after a hash of the data and the parameters, 
+        so a later call with the same inputs skips the chunks already 
+        saved and resumes with the first one missing, starting from the 
+        state of the figure at its first frame.
+        '''
+        checkpoint_dir = Path(self.checkpoint_dir)
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        frames = self.get_frames()
+        self.set_writer_periods(frames)
+        bounds = self.get_checkpoint_bounds(frames)
+        digest = hash_content(self.df, self.params)[:16]
+        paths = [checkpoint_dir / f'{digest}_{k:04d}.{self.extension}' 
+                 for k in range(len(bounds))]
+        n_saved = next((k for k, path in enumerate(paths) if not path.exists()), len(paths))
+        try:
+            if n_saved == len(paths):
+                _log.info('All %d chunks are already saved', len(paths))
+            else:
+                start = bounds[n_saved][0]
+                if n_saved:
+                    _log.info('Resuming at frame %d after %d saved chunks', 
+                              self.start_frame + start, n_saved)
+                self.rows_before_start = (list(self.rows_before_start) 
+                                          + [i for i in frames[:start] if i is not None])
+                init_func = self.init_func
+                for (a, b), path in zip(bounds[n_saved:], paths[n_saved:]):
+                    # an interrupted chunk is never mistaken for a saved one
+                    tmp_path = path.with_name(f'{path.stem}.tmp{path.suffix}')
+                    self.save_frames(frames[a:b], str(tmp_path), init_func)
+                    os.replace(tmp_path, path)
+                    # the next chunk continues from the figure as it is
+                    init_func = lambda: None
+        finally:
+            plt.rcParams = self.orig_rcParams
+
+        concat_segments(paths, Path(self.filename), checkpoint_dir / f'{digest}.txt')
+        for path in paths:
+            path.unlink()
+        self.warn_repeated_frames(len(frames))
+
+    def make_animation(self):
+        frames = self.get_frames()
+        self.set_writer_periods(frames)
+
+        try:
+            if self.html:
+                ret_val = self.display_html(self.get_html5_video(frames))
+            else:
+                ret_val = self.save_frames(frames, self.get_outfile(), self.init_func)
+                if self.output == 'html':
+                    ret_val = self.display_html(self.get_html_tag())
+        except Exception as e:
+            message = str(e)
+            raise Exception(message)
+        finally:
+            plt.rcParams = self.orig_rcParams
+
+        self.warn_repeated_frames(len(frames))
+        return ret_val
+
+    def get_html5_video(self, frames):
+        interval = self.period_length / self.steps_per_period
+        frame_durations = None
+        if FuncAnimation.streams_html_video():
+            # pauses lengthen the frame before them instead of being drawn
+            frames, frame_durations = self.get_held_frames(frames)
+        anim = FuncAnimation(self.fig, self.anim_func, frames, self.init_func, 
+                             interval=interval)
+        savefig_kwargs = {'facecolor': self.get_savefig_facecolor()}
+        return anim.to_html5_video(savefig_kwargs=savefig_kwargs, 
+                                   frame_durations=frame_durations)
+
+    @staticmethod
+    def display_html(text):
+        # shown as html in notebooks, returned as a string elsewhere
+        try:
+            from IPython.display import HTML
+        except ImportError:
+            return text
+        return HTML(text)
+
+    def save_frames(self, frames, outfile, init_func):
+        interval = self.period_length / self.steps_per_period
+        writer = self.get_pipelined_writer(self.writer)
+        if isinstance(writer, BufferWriter):
+            # pauses lengthen the frame before them instead of being drawn
+            frames, writer.frame_durations = self.get_held_frames(frames)
+        anim = FuncAnimation(self.fig, self.anim_func, frames, init_func, interval=interval)
+        # fps can only be given when matplotlib creates the writer
+        fps = self.fps if isinstance(writer, str) else None
+        savefig_kwargs = {'facecolor': self.get_savefig_facecolor()}
+        return anim.save(outfile, fps=fps, writer=writer, savefig_kwargs=savefig_kwargs)
+
+    def get_held_frames(self, frames):
+        # drop the frames repeating the one before, adding to its duration
+        interval = self.period_length / self.steps_per_period
+        held_frames, durations = [], []
+        for i in frames:
+            if i is None:
+                durations[-1] += interval
+            else:
+                held_frames.append(i)
+                durations.append(interval)
+        return held_frames, durations
+
+    def get_savefig_facecolor(self):
+        fc = self.fig.get_facecolor()
+        if fc == (1, 1, 1, 0):
+            fc = 'white'
+        return fc
+
+    def iter_frames(self):
+        '''
+        Draw each frame of the animation and yield a tuple of the frame 
+        number, the period label and an (H, W, 4) uint8 RGBA array read 
+        from the canvas buffer.
+        '''
+        frames = self.get_frames()
+        periods = self.get_frame_periods(frames)
+        facecolor = self.get_savefig_facecolor()
+        try:
+            self.init_func()
+            for k, i in enumerate(frames, self.start_frame):
+                # pause frames repeat the last one without drawing it again
+                if i is not None:
+                    self.anim_func(i)
+                    buf = grab_buffer(self.fig, facecolor=facecolor)
+                yield k, periods[k - self.start_frame], buf if i is not None else buf.copy()
+        finally:
+            plt.rcParams = self.orig_rcParams
+        self.warn_repeated_frames(len(frames))
+
+    def get_frame_periods(self, frames):
+        # pause frames are None and keep the period of the frame before them
+        periods = []
+        for i in frames:
+            if i is not None:
+                period = self.str_index[i]
+            periods.append(period)
+        return periods
+
+    def get_palette_colors(self):
+        # colors known to appear in the animation, used to build GIF palettes
+        ax = self.fig.axes[0]
+        data_colors, alpha = self.get_data_colors()
+        background = mcolors.to_rgb(ax.get_facecolor())
+        data_colors = mcolors.to_rgba_array(data_colors)
+        alpha = data_colors[:, 3:] * alpha
+        data_colors = data_colors[:, :3] * alpha + np.array(background) * (1 - alpha)
+        other_colors = [self.fig.get_facecolor(), ax.get_facecolor(), 'white', 
+                        plt.rcParams['text.color'], plt.rcParams['xtick.color'], 
+                        plt.rcParams['ytick.color']]
+        other_colors = mcolors.to_rgba_array(other_colors)[:, :3]
+        return np.vstack((data_colors, other_colors))
+
     def get_fig_kwargs(self, fig_kwargs):
         default_fig_kwargs = {'figsize': (6, 3.5), 'dpi': 144}
         if fig_kwargs is None:
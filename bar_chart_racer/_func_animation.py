@@ -1,4 +1,5 @@
 import base64
+import logging
 from io import BytesIO, TextIOWrapper
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -6,9 +7,61 @@ from tempfile import TemporaryDirectory
 from matplotlib import rcParams
 from matplotlib import animation
 
+from ._writers import FFMpegStreamWriter, PipelinedWriter
+
+_log = logging.getLogger(__name__)
+
+
+class _EmbedLimitExceeded(Exception):
+    pass
+
+
+class Base64Buffer:
+    """
+    File-like object that base64 encodes the bytes written to it as they
+    arrive, so that the encoded video is the only copy held in memory.
+    Writing raises ``_EmbedLimitExceeded`` once the encoded size reaches
+    *limit* bytes.
+    """
+
+    # encodebytes puts the encoding of every 57 bytes on its own line
+    block_size = 57
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.size = 0
+        self._chunks = []
+        self._rest = b''
+
+    def write(self, data):
+        data = self._rest + bytes(data)
+        n = len(data) - len(data) % self.block_size
+        self._rest = data[n:]
+        self._add(base64.encodebytes(data[:n]))
+        return len(data)
+
+    def _add(self, encoded):
+        self.size += len(encoded)
+        if self.limit is not None and self.size >= self.limit:
+            raise _EmbedLimitExceeded
+        self._chunks.append(encoded)
+
+    def getvalue(self):
+        if self._rest:
+            self._add(base64.encodebytes(self._rest))
+            self._rest = b''
+        return b''.join(self._chunks).decode('ascii')
+
+
 class FuncAnimation(animation.FuncAnimation):
 
-    def to_html5_video(self, embed_limit=None, savefig_kwargs=None):
+    @staticmethod
+    def streams_html_video():
+        # the embedded video is streamed from ffmpeg by a writer taking the 
+        # canvas buffer, which can hold a frame for several frame durations
+        return rcParams['animation.writer'] == 'ffmpeg'
+
+    def to_html5_video(self, embed_limit=None, savefig_kwargs=None, frame_durations=None):
         """
         Convert the animation to an HTML5 ``<video>`` tag.
 
@@ -25,6 +78,11 @@ class FuncAnimation(animation.FuncAnimation):
             if the limit is exceeded.
             Defaults to :rc:`animation.embed_limit` = 20.0.
 
+        frame_durations : list of float, optional
+            Duration of each frame in milliseconds, so that a pause is 
+            written from a single drawing of the figure. Only possible when 
+            the video is streamed from ffmpeg, see `streams_html_video`.
+
         Returns
         -------
         video_tag : str
@@ -46,29 +104,46 @@ class FuncAnimation(animation.FuncAnimation):
             # Convert from MB to bytes
             embed_limit *= 1024 * 1024
 
-            # Can't open a NamedTemporaryFile twice on Windows, so use a
-            # TemporaryDirectory instead.
-            with TemporaryDirectory() as tmpdir:
-                path = Path(tmpdir, "temp.m4v")
-                # We create a writer manually so that we can get the
-                # appropriate size for the tag
-                Writer = animation.writers[rcParams['animation.writer']]
-                writer = Writer(codec='h264',
-                                bitrate=rcParams['animation.bitrate'],
-                                fps=1000. / self._interval)
-                self.save(str(path), writer=writer, savefig_kwargs=savefig_kwargs)
-                # Now open and base64 encode.
-                vid64 = base64.encodebytes(path.read_bytes())
-
-            vid_len = len(vid64)
-            if vid_len >= embed_limit:
+            writer_kwargs = {'codec': 'h264', 'bitrate': rcParams['animation.bitrate'],
+                             'fps': 1000. / self._interval}
+            if self.streams_html_video():
+                # Base64 encode the video as ffmpeg streams it from its
+                # stdout and stop as soon as it exceeds the limit.
+                video = Base64Buffer(embed_limit)
+                writer = FFMpegStreamWriter('mp4', **writer_kwargs)
+                pipelined = PipelinedWriter(writer)
+                pipelined.frame_durations = frame_durations
+                try:
+                    self.save(video, writer=pipelined, savefig_kwargs=savefig_kwargs)
+                    vid64 = video.getvalue()
+                except _EmbedLimitExceeded:
+                    vid64 = None
+                vid_len = video.size
+            else:
+                if frame_durations is not None:
+                    raise ValueError('`frame_durations` can only be used when '
+                                     'rcParams["animation.writer"] is "ffmpeg"')
+                # Can't open a NamedTemporaryFile twice on Windows, so use a
+                # TemporaryDirectory instead.
+                with TemporaryDirectory() as tmpdir:
+                    path = Path(tmpdir, "temp.m4v")
+                    # We create a writer manually so that we can get the
+                    # appropriate size for the tag
+                    Writer = animation.writers[rcParams['animation.writer']]
+                    writer = Writer(**writer_kwargs)
+                    self.save(str(path), writer=writer, savefig_kwargs=savefig_kwargs)
+                    # Now open and base64 encode.
+                    vid64 = base64.encodebytes(path.read_bytes()).decode('ascii')
+                vid_len = len(vid64)
+
+            if vid64 is None or vid_len >= embed_limit:
                 _log.warning(
-                    "Animation movie is %s bytes, exceeding the limit of %s. "
+                    "Animation movie is at least %s bytes, exceeding the limit of %s. "
                     "If you're sure you want a large animation embedded, set "
                     "the animation.embed_limit rc parameter to a larger value "
                     "(in MB).", vid_len, embed_limit)
             else:
-                self._base64_video = vid64.decode('ascii')
+                self._base64_video = vid64
                 self._video_size = 'width="{}" height="{}"'.format(
                         *writer.frame_size)
 
@@ -1,34 +1,132 @@
+import inspect
 import warnings
 from pathlib import Path
 
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from ._func_animation import FuncAnimation
-from matplotlib.collections import LineCollection
+from matplotlib.collections import LineCollection, PolyCollection
 from matplotlib import ticker, colors as mcolors, dates as mdates
 from matplotlib import image as mimage
 from matplotlib import patches as mpatches
+from matplotlib import artist as martist
+from matplotlib.backends.backend_agg import RendererAgg
 
 from ._common_chart import CommonChart
 from ._utils import prepare_wide_data
+from ._writers import grab_buffer
 
 
 OTHERS_COLOR = .7, .7, .7, .6
 AGG_COLOR = 0, 0, 0, 1
+# quantiles of the others spanned by the band of others_line_func='band'
+BAND_QUANTILES = .1, .9
+BAND_ALPHA = .3
+
+# DataFrame agg strings computed with one NumPy reduction over the rows
+ROW_REDUCTIONS = {
+    'sum': np.nansum,
+    'mean': np.nanmean,
+    'median': np.nanmedian,
+    'min': np.nanmin,
+    'max': np.nanmax,
+    'std': lambda arr, axis: np.nanstd(arr, axis=axis, ddof=1),
+    'var': lambda arr, axis: np.nanvar(arr, axis=axis, ddof=1),
+}
+# reductions whose value between two periods interpolates their values at them
+LINEAR_REDUCTIONS = ('sum', 'mean')
+
+
+def m4_indices(columns, y):
+    '''
+    Positions of the first, last, lowest and highest point of each run of 
+    points sharing a pixel column, in order. A line through only these 
+    points covers the same pixel columns and rows as the line through all 
+    of them.
+    '''
+    new_run = np.diff(columns, prepend=columns[0] - 1) != 0
+    starts = np.flatnonzero(new_run)
+    ends = np.append(starts[1:], len(columns)) - 1
+    # points sorted by y within each run, the runs staying in place
+    order = np.lexsort((y, np.cumsum(new_run)))
+    return np.unique(np.concatenate((starts, ends, order[starts], order[ends])))
+
+
+class _LineHistory(martist.Artist):
+    '''
+    Artist drawing the lines from a raster of the figure's size that holds 
+    every segment drawn so far. Each call to `add` draws the segments added 
+    to the collections since the last call onto the raster and leaves only 
+    the newest segment in each, so drawing a frame takes the same time 
+    however long the lines have become.
+    '''
+
+    def __init__(self, fig, collections):
+        super().__init__()
+        self.fig = fig
+        self.collections = collections
+        self.set_zorder(max((c.get_zorder() for c in collections), default=2))
+        self.clear()
+
+    def clear(self):
+        w, h = self.fig.canvas.get_width_height(physical=True)
+        self.renderer = RendererAgg(w, h, self.fig.dpi)
+
+    def add(self):
+        for collection in self.collections:
+            seg = collection.get_segments()
+            n = len(seg)
+            if n < 2:
+                continue
+            colors, lw = collection.get_colors(), collection.get_linewidths()
+            # the first segment is already drawn
+            collection.set_segments(seg[1:])
+            collection.set_color(colors[1:] if len(colors) == n else colors)
+            collection.set_linewidths(lw[1:] if len(lw) == n else lw)
+            if collection.get_visible():
+                collection.draw(self.renderer)
+            collection.set_segments(seg[-1:])
+            collection.set_color(colors[-1:])
+            collection.set_linewidths(lw[-1:])
+        self.stale = True
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        if (renderer.width, renderer.height) != (self.renderer.width, self.renderer.height):
+            raise ValueError('With `history_buffer`, frames must be saved at the dpi of the figure')
+        buf = np.asarray(self.renderer.buffer_rgba())
+        gc = renderer.new_gc()
+        renderer.draw_image(gc, 0, 0, buf[::-1])
+        gc.restore()
 
 
 class _LineChartRace(CommonChart):
+
+    # row 0 is drawn by init_func
+    first_frame = 1
     
     def __init__(self, df, filename, n_lines, steps_per_period, period_length, 
                  end_period_pause, period_summary_func, line_width_data, agg_line_func, 
                  agg_line_kwargs, others_line_func, others_line_kwargs, fade, min_fade, 
                  images, colors, title, line_label_font, tick_label_font, tick_template, 
-                 shared_fontdict, scale, fig, writer, line_kwargs, fig_kwargs):
+                 shared_fontdict, scale, fig, writer, line_kwargs, fig_kwargs, output, 
+                 step_budget, frame_range, period_range, checkpoint_dir, history_buffer, 
+                 decimate, spread_labels):
+        # hash the parameters before any of them are modified below
+        self.params = {k: v for k, v in locals().items() 
+                       if k not in ('self', 'df', 'filename', 'output', 'checkpoint_dir')}
+        # every column feeds the chart, even those not drawn as bars or lines
+        self.df = df
         self.filename = filename
+        self.output = output
         self.extension = self.get_extension()
         self.n_lines = n_lines or df.shape[1]
         self.steps_per_period = steps_per_period
+        self.step_budget = step_budget
+        self.frame_range = frame_range
+        self.period_range = period_range
+        self.checkpoint_dir = checkpoint_dir
         self.period_length = period_length
         self.end_period_pause = end_period_pause
         self.period_summary_func = period_summary_func
@@ -39,13 +137,15 @@ class _LineChartRace(CommonChart):
         self.line_width_data = self.get_line_width_data(line_width_data)
         self.fade = fade
         self.min_fade = min_fade
+        self.history_buffer = history_buffer
+        self.decimate = decimate
+        self.spread_labels = spread_labels
         self.title = self.get_title(title)
         self.line_label_font = self.get_font(line_label_font)
         self.tick_label_font = self.get_font(tick_label_font, True)
         self.tick_template = self.get_tick_template(tick_template)
         self.orig_rcParams = self.set_shared_fontdict(shared_fontdict)
         self.scale = scale
-        self.writer = self.get_writer(writer)
         self.fps = 1000 / self.period_length * steps_per_period
         self.validate_params()
 
@@ -53,15 +153,23 @@ class _LineChartRace(CommonChart):
         self.html = self.filename is None
         self.all_values, self.df_values, self.df_ranks, self.df_others, self.others_agg_line = self.prepare_data(df)
         self.agg_line = self.prepare_agg_line()
+        self.scheduled_rows = self.get_scheduled_rows(self.n_lines)
         self.is_x_date = self.df_values.index.dtype.kind == 'M'
+        self.x_values, self.line_values, self.line_widths, self.visible_values = \
+            self.prepare_frame_arrays()
+        self.others_band = self.prepare_others_band()
         self.colors = self.get_colors(colors)
         self.str_index = self.df_values.index.astype('str')
         self.fig_kwargs = self.get_fig_kwargs(fig_kwargs)
         self.subplots_adjust = self.get_subplots_adjust()
         self.fig = self.get_fig(fig)
+        self.writer = self.get_writer(writer)
         self.collections = {}
         self.other_collections = {}
         self.texts = {}
+        self.history = None
+        self.band = None
+        self.label_heights = {}
         self.images = self.get_images(images)
         self.image_radius = self.fig.get_figwidth() * self.fig.dpi * .02
 
@@ -108,11 +216,15 @@ class _LineChartRace(CommonChart):
         return df
 
     def validate_params(self):
-        if isinstance(self.filename, str):
-            if '.' not in self.filename:
-                raise ValueError('`filename` must have an extension')
-        elif self.filename is not None:
-            raise TypeError('`filename` must be None or a string')
+        self.validate_filename()
+
+        self.validate_output()
+        self.validate_step_budget()
+        self.validate_ranges()
+        self.validate_checkpoint_dir()
+
+        if self.history_buffer and self.fade != 1:
+            raise ValueError('`history_buffer` can only be used when `fade` is 1')
 
     def get_font(self, font, ticks=False):
         default_font_dict = {'size': 7, 'ha': 'left', 'va': 'center'}
@@ -142,7 +254,7 @@ class _LineChartRace(CommonChart):
         all_values = values.copy()
         values, ranks, others = values[top_cols], ranks[top_cols], values[other_cols]
 
-        if self.others_line_func in (None, True) or len(other_cols) == 0:
+        if self.others_line_func in (None, True, 'band') or len(other_cols) == 0:
             others_agg_line = None
         else:
             others_agg_line = self.prepare_others_agg_line(others)
@@ -150,10 +262,10 @@ class _LineChartRace(CommonChart):
 
     def prepare_others_agg_line(self, others):
         if isinstance(self.others_line_func, str):
-            s_others = others.agg(self.others_line_func, axis=1)
+            s_others = self.aggregate_rows(others, self.others_line_func)
             label = self.others_line_func
         elif callable(self.others_line_func):
-            s_others = others.agg(self.others_line_func, axis=1)
+            s_others = self.aggregate_rows(others, self.others_line_func)
             label = self.others_line_func.__name__
         else:
             raise TypeError('`others_line_func` must be either a string or function')
@@ -162,14 +274,77 @@ class _LineChartRace(CommonChart):
             self.others_line_label = label
         return s_others
 
+    def prepare_frame_arrays(self):
+        # arrays indexed by row so that drawing a frame only slices them
+        x = self.df_values.index
+        x = mdates.date2num(x) if self.is_x_date else np.asarray(x, dtype=float)
+
+        values = {col: self.df_values[col].to_numpy() for col in self.df_values.columns}
+        if self.agg_line is not None:
+            values['___agg_line___'] = self.agg_line.to_numpy()
+        if self.others_agg_line is not None:
+            values['___others_line___'] = self.others_agg_line.to_numpy()
+
+        line_widths = None
+        if self.line_width_data is not None:
+            # line_width_data has one row for each period
+            period = np.arange(len(self.df_values)) // self.steps_per_period
+            line_widths = {col: self.line_width_data[col].to_numpy()[period] 
+                           for col in self.df_values.columns}
+
+        n = 1_000_000 # make all visible until better logic here
+        visible = self.df_ranks.to_numpy() <= self.n_lines + n + .5
+        return x, values, line_widths, visible
+
+    def prepare_others_band(self):
+        if not isinstance(self.others_line_func, str) or self.others_line_func != 'band':
+            return None
+        if self.df_others.shape[1] == 0:
+            return None
+        quantiles = self.others_line_kwargs.get('quantiles', BAND_QUANTILES)
+        if len(quantiles) != 2 or not 0 <= quantiles[0] <= quantiles[1] <= 1:
+            raise ValueError('`quantiles` of `others_line_kwargs` must be a low and a high '
+                             'quantile between 0 and 1')
+        with warnings.catch_warnings():
+            # rows of only NaN give NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            low, high = np.nanquantile(self.df_others.to_numpy(dtype=float), quantiles, axis=1)
+        return self.x_values, low, high
+
+    def aggregate_rows(self, df, func):
+        # one value for each row of df, with a single NumPy call when possible
+        if isinstance(func, str) and func in ROW_REDUCTIONS:
+            arr = df.to_numpy(dtype=float)
+            reduce = ROW_REDUCTIONS[func]
+            step = self.steps_per_period
+            with warnings.catch_warnings():
+                # rows of only NaN give NaN
+                warnings.simplefilter('ignore', RuntimeWarning)
+                if func in LINEAR_REDUCTIONS and step > 1 and not np.isnan(arr).any():
+                    # reduce the periods only and interpolate between them like the values
+                    period_values = reduce(arr[::step], axis=1)
+                    values = np.interp(np.arange(len(arr)), np.arange(0, len(arr), step),
+                                       period_values)
+                else:
+                    values = reduce(arr, axis=1)
+        elif callable(func) and getattr(func, 'vectorized', False):
+            values = np.asarray(func(df.to_numpy(dtype=float)))
+            if values.shape != (len(df),):
+                raise ValueError(f'Vectorized function {func.__name__} must return one value '
+                                 f'for each of the {len(df)} rows, not an array of shape '
+                                 f'{values.shape}')
+        else:
+            return df.agg(func, axis=1)
+        return pd.Series(values, index=df.index)
+
     def prepare_agg_line(self):
         if self.agg_line_func is None:
             return
         if isinstance(self.agg_line_func, str):
-            s_agg = self.all_values.agg(self.agg_line_func, axis=1)
+            s_agg = self.aggregate_rows(self.all_values, self.agg_line_func)
             label = self.agg_line_func
         elif callable(self.agg_line_func):
-            s_agg = self.all_values.agg(self.agg_line_func, axis=1)
+            s_agg = self.aggregate_rows(self.all_values, self.agg_line_func)
             label = self.agg_line_func.__name__
         else:
             raise TypeError('`agg_line_func` must be either a string or function')
@@ -212,6 +387,11 @@ class _LineChartRace(CommonChart):
         colors = colors[:self.df_values.shape[1]]
         return dict(zip(self.df_values.columns, colors))
 
+    def get_data_colors(self):
+        colors = [*self.colors.values(), self.others_line_kwargs['color'], 
+                  self.agg_line_kwargs['color'], OTHERS_COLOR]
+        return colors, self.line_kwargs.get('alpha', 1)
+
     def prepare_axes(self, ax):
         ax.grid(True, color='white')
         ax.tick_params(labelsize=self.tick_label_font['size'], length=0, pad=2)
@@ -229,6 +409,9 @@ class _LineChartRace(CommonChart):
         elif self.others_agg_line is not None:
             min_val = min(min_val, self.others_agg_line.min())
             max_val = max(max_val, self.others_agg_line.max())
+        elif self.others_band is not None:
+            min_val = min(min_val, np.nanmin(self.others_band[1]))
+            max_val = max(max_val, np.nanmax(self.others_band[2]))
             
         if self.agg_line is not None:
             min_val = min(min_val, self.agg_line.min())
@@ -310,8 +493,7 @@ class _LineChartRace(CommonChart):
         return {col: mimage.imread(image) for col, image in images.items()}
             
     def get_visible(self, i):
-        n = 1_000_000 # make all visible until better logic here
-        return (self.df_ranks.iloc[i] <= self.n_lines + n + .5).to_dict()
+        return dict(zip(self.df_values.columns, self.visible_values[i]))
 
     def add_period_summary(self, ax, s):
         if self.period_summary_func:
@@ -326,11 +508,7 @@ class _LineChartRace(CommonChart):
         if i is None:
             return
         ax = self.fig.axes[0]
-        s = self.df_values.iloc[i]
-        s_all = self.all_values.iloc[i]
-        x, y = s.name, s.to_dict()
-        if self.is_x_date:
-            x = mdates.date2num(x)
+        x = self.x_values[i]
 
         if self.images:
             xmin, xmax = ax.get_xlim()
@@ -339,18 +517,11 @@ class _LineChartRace(CommonChart):
             x_extra = 0
 
         visible = self.get_visible(i)
-
-        if self.agg_line is not None:
-            y['___agg_line___'] = self.agg_line.iloc[i]
-            visible['___agg_line___'] = True
-
-        if self.others_agg_line is not None:
-            y['___others_line___'] = self.others_agg_line.iloc[i]
-            visible['___others_line___'] = True
+        visible['___agg_line___'] = visible['___others_line___'] = True
 
         for col, collection in self.collections.items():
             text = self.texts[col]
-            val = y[col]
+            val = self.line_values[col][i]
             color = self.colors[col]
             vis = visible[col]
 
@@ -362,12 +533,14 @@ class _LineChartRace(CommonChart):
             color_arr = collection.get_colors()
 
             color_arr = np.append(color_arr, [color], axis=0)
-            color_arr[:, -1] = np.clip(color_arr[:, -1] * self.fade, self.min_fade, None)
+            # rows that were not drawn still fade the older segments
+            fade = self.fade ** (i - self.last_row)
+            color_arr[:, -1] = np.clip(color_arr[:, -1] * fade, self.min_fade, None)
             collection.set_color(color_arr)
 
             is_other_agg = col in ('___others_line___', '___agg_line___')
-            if self.line_width_data is not None and not is_other_agg:
-                lw = self.line_width_data.iloc[i // self.steps_per_period][col]
+            if self.line_widths is not None and not is_other_agg:
+                lw = self.line_widths[col][i]
                 lw_arr = collection.get_linewidths()
                 lw_arr = np.append(lw_arr, [lw], axis=0)
                 collection.set_linewidths(lw_arr)
@@ -377,17 +550,22 @@ class _LineChartRace(CommonChart):
             collection.set_visible(vis)
 
         if self.others_line_func is True:
-            y_other = self.df_others.iloc[i].to_dict()
-            for col, collection in self.other_collections.items():
-                val = y_other[col]
+            y_other = self.df_others.values[i]
+            for val, collection in zip(y_other, self.other_collections.values()):
                 seg = collection.get_segments()
                 last = seg[-1][-1]
                 new_seg = np.row_stack((last, [x, val]))
                 seg.append(new_seg)
                 collection.set_segments(seg)
 
+        if self.band is not None:
+            self.set_band(i)
+
+        if self.spread_labels:
+            self.spread_line_labels()
+
         if self.period_summary_func:
-            text_dict = self.add_period_summary(ax, s_all)
+            text_dict = self.add_period_summary(ax, self.all_values.iloc[i])
             text = self.texts['__period_summary_func__']
             x_period, y_period, text_val = text_dict.pop('x'), text_dict.pop('y'), text_dict.pop('s')
             text.set_position((x_period, y_period))
@@ -395,7 +573,7 @@ class _LineChartRace(CommonChart):
 
         if self.images:
             for col in self.df_values.columns:
-                xpixel, ypixel = ax.transData.transform((x, y[col]))
+                xpixel, ypixel = ax.transData.transform((x, self.line_values[col][i]))
                 center = xpixel, ypixel
                 left, right = xpixel - self.image_radius, xpixel + self.image_radius
                 bottom, top = ypixel - self.image_radius, ypixel + self.image_radius
@@ -406,8 +584,151 @@ class _LineChartRace(CommonChart):
                 vis = visible[col]
                 img.set_visible(vis)
 
+        self.last_row = i
+        if self.history is not None:
+            self.history.add()
+        elif self.decimate:
+            self.decimate_lines()
+
+    def spread_line_labels(self):
+        """
+        Move the visible line labels vertically so that none of them overlap. 
+        Sorted by height, each label must be half the heights of it and the 
+        label below apart from that label. Pushing the labels up from the 
+        bottom and down from the top both meet this with a cumulative max 
+        or min, and their average keeps each group of crowded labels 
+        centered on its lines. Labels that do not overlap are not moved.
+        """
+        texts = [text for col, text in self.texts.items() 
+                 if col != '__period_summary_func__' and text.get_visible()]
+        if len(texts) < 2:
+            return
+        ax = self.fig.axes[0]
+        xy = ax.transData.transform([text.get_position() for text in texts])
+        heights = np.array([self.get_label_height(text) for text in texts])
+        idx = np.flatnonzero(np.isfinite(xy[:, 1]))
+        idx = idx[np.argsort(xy[idx, 1], kind='stable')]
+        y, h = xy[idx, 1], heights[idx]
+        # the least distance from the lowest label to each label
+        gap = np.append(0, np.cumsum((h[:-1] + h[1:]) / 2))
+        up = np.maximum.accumulate(y - gap) + gap
+        down = np.minimum.accumulate((y - gap)[::-1])[::-1] + gap
+        spread = (up + down) / 2
+        moved = ~np.isclose(spread, y, rtol=0, atol=1e-6)
+        idx = idx[moved]
+        xy[idx, 1] = spread[moved]
+        y_data = ax.transData.inverted().transform(xy[idx])[:, 1]
+        for k, val in zip(idx, y_data):
+            texts[k].set_y(val)
+
+    def get_label_height(self, text):
+        # the labels never change, so each is measured once
+        label = text.get_text()
+        if label not in self.label_heights:
+            self.label_heights[label] = text.get_window_extent().height
+        return self.label_heights[label]
+
+    def decimate_lines(self):
+        """
+        Once a line has several times more points than the axes are wide 
+        in pixels, keep only the first, last, lowest and highest point of 
+        each pixel column of its older points. The newest points, about 
+        one for each pixel column, are kept as they are.
+        """
+        ax = self.fig.axes[0]
+        width = max(int(ax.get_window_extent().width), 1)
+        limit = 6 * width
+        for collection in [*self.collections.values(), *self.other_collections.values()]:
+            if len(collection.get_paths()) <= limit:
+                continue
+            seg = collection.get_segments()
+            # the first segment is the single point of row 0
+            points = np.vstack([seg[0][:1]] + [s[-1:] for s in seg[1:]])
+            n_old = len(points) - width
+            xy = ax.transData.transform(points[:n_old])
+            keep = m4_indices(np.floor(xy[:, 0]).astype(int), xy[:, 1])
+            keep = np.append(keep, np.arange(n_old, len(points)))
+            # each segment kept ends at a point kept, taking its color and width
+            new_seg = np.stack((points[keep[:-1]], points[keep[1:]]), axis=1)
+            collection.set_segments([points[:1]] + list(new_seg))
+            colors, lw = collection.get_colors(), collection.get_linewidths()
+            if len(colors) == len(seg):
+                collection.set_color(colors[keep])
+            if len(lw) == len(seg):
+                collection.set_linewidths(lw[keep])
+
+    def set_lines(self, rows):
+        """
+        Set the lines to the state left by drawing row 0 and then each of 
+        `rows` in turn with anim_func, whatever their state before. All of 
+        the segments, fade alphas and widths are built at once from the 
+        prepared data. The texts and images are left to the next row drawn.
+        """
+        # row 0 is drawn by init_func
+        rows = np.append(0, rows).astype(int)
+        x = self.x_values[rows]
+        # each row fades all segments, its own included, by the rows since 
+        # the row drawn before it
+        fade = self.fade ** (rows[-1] - np.append(0, rows[:-1]))
+
+        for col, collection in self.collections.items():
+            self.set_segments(collection, x, self.line_values[col][rows])
+            color_arr = np.tile(self.colors[col], (len(rows), 1))
+            color_arr[:, -1] = np.clip(color_arr[:, -1] * fade, self.min_fade, None)
+            collection.set_color(color_arr)
+
+            is_other_agg = col in ('___others_line___', '___agg_line___')
+            if self.line_widths is not None and not is_other_agg:
+                collection.set_linewidths(self.line_widths[col][rows])
+
+        if self.others_line_func is True:
+            for col, collection in self.other_collections.items():
+                self.set_segments(collection, x, self.df_others[col].values[rows])
+
+        if self.band is not None:
+            self.set_band(rows[-1])
+
+        self.last_row = rows[-1]
+        if self.history is not None:
+            # the lines are drawn again from the start
+            self.history.clear()
+
+    def set_segments(self, collection, x, y):
+        # the point of the first row followed by segments joining each point to the next
+        points = np.column_stack((x, y))
+        seg = np.stack((points[:-1], points[1:]), axis=1)
+        collection.set_segments([points[:1]] + list(seg))
+
+    def set_band(self, i):
+        # the polygon along the low quantiles from row 0 to row i and back along the high ones
+        x, low, high = self.others_band
+        verts = np.concatenate((np.column_stack((x[:i + 1], low[:i + 1])), 
+                                np.column_stack((x[i::-1], high[i::-1]))))
+        self.band.set_verts([verts])
+
+    def render_frame(self, k):
+        """
+        Draw frame `k` of the whole race, counting the frames of pauses, 
+        and return it as an (H, W, 4) uint8 RGBA array. The history of the 
+        lines is built directly for that frame, so frames can be drawn in 
+        any order, or by separate processes, and look the same as when the 
+        whole race is drawn in order.
+        """
+        frames, _ = self.get_race_frames()
+        if not -len(frames) <= k < len(frames):
+            raise IndexError(f'Frame {k} is out of range for {len(frames)} frames')
+        if not self.collections:
+            self.init_func()
+        k %= len(frames)
+        # held frames show the last row drawn
+        drawn = [i for i in frames[:k + 1] if i is not None]
+        self.set_lines(drawn[:-1])
+        self.anim_func(drawn[-1])
+        return grab_buffer(self.fig, facecolor=self.get_savefig_facecolor())
+
     def init_func(self):
         ax = self.fig.axes[0]
+        self.last_row = 0
         s = self.df_values.iloc[0] # current Series
         s_all = self.all_values.iloc[0]
         if len(self.df_others) > 0:
@@ -446,6 +767,15 @@ class _LineChartRace(CommonChart):
                 collection = ax.add_collection(LineCollection([[(x, val)]], colors=[OTHERS_COLOR]))
                 self.other_collections[col] = collection
 
+        if self.others_band is not None:
+            color = self.others_line_kwargs['color']
+            alpha = self.others_line_kwargs.get('alpha', BAND_ALPHA)
+            color = tuple(color[:3]) + (alpha,)
+            # a single polygon whatever the number of other columns, below the lines
+            self.band = ax.add_collection(PolyCollection([], facecolors=[color], 
+                                                         edgecolors='none', zorder=1.5))
+            self.set_band(0)
+
         if self.agg_line is not None:
             color = self.agg_line_kwargs['color']
             lw = self.agg_line_kwargs.get('lw')
@@ -480,6 +810,9 @@ class _LineChartRace(CommonChart):
             self.texts[label] = text
             self.colors[label] = color
 
+        if self.spread_labels:
+            self.spread_line_labels()
+
         if self.period_summary_func:
             text_dict = self.add_period_summary(ax, s_all)
             text = ax.text(transform=ax.transAxes, **text_dict)
@@ -500,45 +833,21 @@ class _LineChartRace(CommonChart):
                 img.set_visible(vis)
                 self.images[col] = img, circle
 
-    def make_animation(self):
-        interval = self.period_length / self.steps_per_period
-        pause = int(self.end_period_pause // interval)
-
-        def frame_generator(n):
-            frames = []
-            for i in range(1, n):
-                frames.append(i)
-                if pause and i % self.steps_per_period == 0 and i != 0 and i != n - 1:
-                    for _ in range(pause):
-                        frames.append(None)
-            return frames
-        
-        frames = frame_generator(len(self.df_values))
-        anim = FuncAnimation(self.fig, self.anim_func, frames, self.init_func, interval=interval)
-
-        try:
-            fc = self.fig.get_facecolor()
-            if fc == (1, 1, 1, 0):
-                fc = 'white'
-            savefig_kwargs = {'facecolor': fc}
-            if self.html:
-                ret_val = anim.to_html5_video(savefig_kwargs=savefig_kwargs)
-                try:
-                    from IPython.display import HTML
-                    ret_val = HTML(ret_val)
-                except ImportError:
-                    pass
-            else:
-                
-                ret_val = anim.save(self.filename, fps=self.fps, writer=self.writer, 
-                                    savefig_kwargs=savefig_kwargs) 
-        except Exception as e:
-            message = str(e)
-            raise Exception(message)
-        finally:
-            plt.rcParams = self.orig_rcParams
+        if self.history_buffer:
+            # the lines are drawn from a raster instead of their collections
+            if self.history is not None:
+                self.history.remove()
+            collections = [c for c in ax.collections if isinstance(c, LineCollection)]
+            self.history = _LineHistory(self.fig, collections)
+            for collection in self.history.collections:
+                collection.remove()
+            ax.add_artist(self.history)
 
-        return ret_val
+        # a slice of the race starts with the lines drawn up to its first row
+        if self.rows_before_start:
+            self.set_lines(self.rows_before_start)
+            if self.history is not None:
+                self.history.add()
 
 
 def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10, 
@@ -548,7 +857,9 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
                     images=None, colors=None, title=None, line_label_font=None, 
                     tick_label_font=None, tick_template='{x:,.0f}', shared_fontdict=None, 
                     scale='linear', fig=None, writer=None, line_kwargs=None, 
-                    fig_kwargs=None):
+                    fig_kwargs=None, output=None, step_budget=None, frame_range=None, 
+                    period_range=None, checkpoint_dir=None, history_buffer=False, 
+                    decimate=False, spread_labels=False):
     '''
     Create an animated line chart race using matplotlib. Data must be in 
     'wide' format where each row represents a single time period and each 
@@ -558,8 +869,8 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
     If no `filename` is given, an HTML string is returned, otherwise the 
     animation is saved to disk.
 
-    You must have ffmpeg installed on your machine to save videos to disk
-    and ImageMagick to save animated gifs. Read more here:
+    You must have ffmpeg installed on your machine to save videos to disk.
+    Animated gifs are written without any external programs. Read more here:
     https://www.dexplo.org/bar_chart_race/installation/
 
     Parameters
@@ -570,10 +881,26 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
         category. Optionally, use the index to label each time period.
         The index can be of any type.
 
-    filename : `None` or str, default None
+    filename : `None`, str or list of str, default None
         If `None` return animation as an HTML5 string. If a string, save 
-        animation to that filename location. Use .mp4, .gif, .html, .mpeg, 
-        .mov or any other extensions supported by ffmpeg or ImageMagick.
+        animation to that filename location. Use .mp4, .gif, .webp, .png
+        (animated PNG), .html, .mpeg, .mov or any other extensions supported 
+        by ffmpeg or ImageMagick.
+
+        Use a pattern such as 'frames/%05d.png' to write each frame to its 
+        own PNG file along with a 'manifest.json' file listing the period 
+        and start time of each frame. Pass 
+        `bar_chart_racer.FrameSequenceWriter(skip_existing=True)` as the 
+        `writer` to skip frames that already exist. A '%' not followed by 
+        digits and 'd', as in 'growth_5%.png', is part of the name.
+
+        Give a list of filenames, such as ['race.mp4', 'race.gif'], to save 
+        the animation to all of them while drawing each frame only once. 
+        The frames are passed to the encoders of the different files at 
+        the same time, each on its own thread. Every file gets the whole 
+        animation, so a '.png' filename such as 'poster.png' is always 
+        saved as an animated PNG rather than a single still frame. Take one 
+        of the frames yielded with `output='frames'` to save a still image.
 
     n_lines : int, default None
         The maximum number of lines to display on the graph. 
@@ -605,6 +932,13 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
         end_period_pause to 725 will produce a pause of 700 
         milliseconds when using the defaults.
 
+        The figure is not drawn again during a pause. GIF, WebP and PNG 
+        files store it as one longer frame and other formats repeat the 
+        last frame drawn, except with writers that only save frames 
+        themselves, such as 'pillow', 'imagemagick' and 'html'. The video 
+        embedded when `filename` is None repeats it too, unless 
+        `animation.writer` in matplotlib's rcParams is not 'ffmpeg'.
+
     period_summary_func : function, default None
         Custom text added to the axes each period.
         Create a user-defined function that accepts one pandas Series of the 
@@ -632,7 +966,14 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
         period as a Series. Return a single value that summarizes the current 
         period.
 
+        A function with the attribute `vectorized` set to `True` is instead 
+        called once with a 2D NumPy array of all the values, one row for 
+        each step of each period, and must return a 1D array with one value 
+        for each row.
+
         DataFrame agg strings - 'mean', 'median', 'max', 'min', etc..
+        'sum', 'mean', 'median', 'min', 'max', 'std' and 'var' are computed 
+        with a single NumPy reduction.
 
     agg_line_kwargs : dict, default None
         A dictionary of matplotlib line properties used with agg_line_func. 
@@ -659,6 +1000,14 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
         def my_others_line_func(s):
             return s.median()
 
+        Vectorized functions and strings are handled as for `agg_line_func`.
+
+        Use 'band' to draw a single shaded band between the 10th and 90th 
+        percentiles of the other values instead of a line for each of them. 
+        The time to draw a frame then no longer depends on the number of 
+        other columns. Set the percentiles with the key 'quantiles' of 
+        `others_line_kwargs`, for instance (.25, .75).
+
     others_line_kwargs : dict, default None
         A dictionary of matplotlib line properties used with others_line_func. 
         Use the key `s` to control the label of the line. Keys `x` and `y` 
@@ -758,9 +1107,28 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
     writer : str or matplotlib Writer instance
         This argument is passed to the matplotlib FuncAnimation.save method.
 
-        By default, the writer will be 'ffmpeg' unless creating a gif,
-        then it will be 'imagemagick', or an html file, then it 
-        will be 'html'. 
+        By default, the writer will be 'ffmpeg' unless creating a gif 
+        or an html file. Gifs are written in-process with a global palette 
+        built from the line and text colors, storing only the part of each 
+        frame that changed. Use 'imagemagick' or 'pillow' to use those 
+        writers instead. Animated WebP and PNG files are also written 
+        in-process the same way, compressing frames on a thread pool. 
+        Html files use the 'html' writer.
+
+        With ffmpeg and the in-process writers, frames are encoded on a 
+        separate thread while the next ones are drawn. At most 8 drawn 
+        frames wait to be encoded. Pass 
+        `bar_chart_racer.PipelinedWriter(writer, queue_size)` to change 
+        that limit.
+
+        When `filename` is a list, give `None` or a list with one writer 
+        (or `None` for the default) for each filename.
+
+        Use `bar_chart_racer.ResizeWriter(scale=.5)` to save a smaller 
+        copy, for instance next to the full size one in a list, shrinking 
+        the frames already drawn instead of drawing them again. Give it a 
+        `dpi` instead of a `scale` to rasterize that output again at 
+        that resolution, keeping small text crisp.
             
         Find all of the availabe Writers:
         >>> from matplotlib import animation
@@ -785,10 +1153,98 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
             'facecolor': 'red'
         }
 
+    output : None, 'frames', 'html' or file-like object, default None
+        Use a file-like object opened in binary mode, such as `io.BytesIO`, 
+        to write the animation to it instead of to disk. The format is 
+        taken from the extension of `filename`, which must be given but 
+        is not written to. Videos are streamed from the stdout of ffmpeg, 
+        with mp4 and mov written as fragmented files. `writer` must then be 
+        None, 'ffmpeg' or one of the writers of this package, as the other 
+        matplotlib writers need a path.
+
+        Use 'html' to save the animation to `filename` and return a small
+        HTML `<video>` tag, or `<img>` tag for gif, webp and png, that 
+        references the file instead of embedding it. The file is linked 
+        by `filename` as given, so use a path relative to the notebook.
+
+        Use 'frames' to return a generator instead of saving the animation.
+        It draws each frame as it is iterated and yields a tuple of the 
+        frame number, the period label and the frame as an (H, W, 4) uint8 
+        RGBA array read directly from the canvas. `filename` and `writer` 
+        are ignored.
+
+        Example:
+        >>> for i, period, frame in line_chart_race(df, output='frames'):
+        ...     my_encoder.write(frame)
+
+    step_budget : int, default None
+        Total number of steps shared out between all the periods according 
+        to how much happens in each, instead of using `steps_per_period` 
+        for every period. Periods where lines swap ranks or move a lot 
+        get more steps, up to `steps_per_period`, and quiet periods as few 
+        as one. Each period still lasts `period_length`, as every frame 
+        is shown until the next one drawn is due. GIF, WebP and PNG files 
+        store frames of varying length and other formats repeat the last 
+        frame drawn without drawing it again.
+
+    frame_range : tuple of (start, stop), default None
+        Only draw and save the frames from `start` up to, but not 
+        including, `stop`, counting every frame of the whole race 
+        including those of pauses. Either value may be None or negative, 
+        as in a slice. The lines are first extended up to the first frame 
+        without being saved, so each frame looks the same as in a render of 
+        the whole race and each range is saved as a file that plays on its own. 
+        Use it to preview part of a race or to split a long race between 
+        several processes or machines.
+        Use `bar_chart_racer.line_chart_frame` to draw a single frame.
+
+    period_range : tuple of (start, stop), default None
+        Same as `frame_range`, with `start` and `stop` given as positions 
+        of the periods (rows of `df`). The range ends just before period 
+        `stop` is reached, so consecutive ranges such as (0, 10) and 
+        (10, None) cover the race exactly once.
+
+    checkpoint_dir : str, default None
+        Directory where the video is saved in chunks of about 1,000 frames 
+        before they are joined into `filename` without encoding them again. 
+        The chunks are named after a hash of the prepared data and the 
+        parameters. When a render stops before it is done, calling this 
+        function again with the same arguments keeps the chunks already 
+        saved and resumes with the first one missing, setting up the lines 
+        directly at its first frame. Only valid when saving a single video 
+        ending in '.mp4', '.m4v', '.mov' or '.mkv'.
+
+    history_buffer : bool, default False
+        When `True`, the lines are kept in a raster the size of the figure 
+        and each frame only adds the newest segment of each line to it, 
+        instead of drawing every segment so far. The time taken to draw a 
+        frame then stays the same as the lines grow. The labels and images 
+        are drawn over the raster as usual. Newer segments are drawn over 
+        older ones where lines cross. Only valid when `fade` is 1, and the 
+        frames must be saved at the dpi of the figure.
+
+    decimate : bool, default False
+        When `True`, lines with several times more points than the axes 
+        are wide in pixels keep only the first, last, lowest and highest 
+        of their older points in each pixel column, which draws nearly the 
+        same line. The newest points are kept as they are. Memory and the time 
+        taken to draw a frame then stay bounded however long the race is. 
+        Has no effect with `history_buffer`.
+
+    spread_labels : bool, default False
+        When `True`, the labels at the end of the lines are moved up or down 
+        in each frame so that they do not overlap, keeping each group of 
+        crowded labels centered on its lines. Labels that do not overlap 
+        stay next to their lines.
+
     Returns
     -------
     When `filename` is left as `None`, an HTML5 video is returned as a string.
     Otherwise, a file of the animation is saved and `None` is returned.
+    With a file-like `output`, the animation is written to it and `None` 
+    is returned. With `output='html'`, an HTML tag referencing the saved 
+    file is returned. With `output='frames'`, a generator of frames is 
+    returned.
 
     Examples
     --------
@@ -836,5 +1292,52 @@ def line_chart_race(df, filename=None, n_lines=None, steps_per_period=10,
                          period_summary_func, line_width_data, agg_line_func, agg_line_kwargs, 
                          others_line_func, others_line_kwargs, fade, min_fade, images, colors, 
                          title, line_label_font, tick_label_font, tick_template, shared_fontdict, 
-                         scale, fig, writer, line_kwargs, fig_kwargs)
+                         scale, fig, writer, line_kwargs, fig_kwargs, output, step_budget, 
+                         frame_range, period_range, checkpoint_dir, history_buffer, 
+                         decimate, spread_labels)
+    if output == 'frames':
+        return lcr.iter_frames()
+    if checkpoint_dir is not None:
+        return lcr.save_checkpoints()
     return lcr.make_animation()
+
+
+def line_chart_frame(df, frame, **kwargs):
+    '''
+    Draw a single frame of a line chart race without drawing the frames 
+    before it. The history of the lines, with their fade alphas and 
+    `line_width_data` widths, is built directly for that frame from the 
+    prepared data, so it looks the same as in a render of the whole race. 
+    Frames can then be drawn in any order, or by separate processes.
+
+    Parameters
+    ----------
+    df : pandas DataFrame
+        The data passed to `line_chart_race`.
+
+    frame : int
+        Position of the frame in the whole race, counting the frames of 
+        pauses. Negative values count from the end.
+
+    **kwargs
+        Any other parameter of `line_chart_race`, except `filename`, 
+        `output`, `frame_range`, `period_range` and `checkpoint_dir`.
+
+    Returns
+    -------
+    The frame as an (H, W, 4) uint8 RGBA array.
+
+    Examples
+    --------
+    >>> frame = bcr.line_chart_frame(df, 250, n_lines=5, fade=.99)
+    '''
+    for name in ('filename', 'output', 'frame_range', 'period_range', 'checkpoint_dir'):
+        if name in kwargs:
+            raise TypeError(f'`{name}` cannot be passed to line_chart_frame')
+    args = inspect.signature(line_chart_race).bind(df, **kwargs)
+    args.apply_defaults()
+    lcr = _LineChartRace(**args.arguments)
+    try:
+        return lcr.render_frame(frame)
+    finally:
+        plt.rcParams = lcr.orig_rcParams
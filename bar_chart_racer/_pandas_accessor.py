@@ -31,7 +31,7 @@ class _BCR:
 
     def bar_chart_race(
         self,
-        filename: Optional[str] = None,
+        filename: Optional[Union[str, List[str]]] = None,
         orientation: Literal['h', 'v'] = 'h',
         sort: Literal['desc', 'asc'] = 'desc',
         n_bars: Optional[int] = None,
@@ -59,8 +59,14 @@ class _BCR:
         writer: Optional[Any] = None,
         bar_kwargs: Optional[Dict[str, Any]] = None,
         fig_kwargs: Optional[Dict[str, Any]] = None,
-        filter_column_colors: bool = False
-    ) -> Union[str, None]:
+        filter_column_colors: bool = False,
+        output: Optional[Any] = None,
+        step_budget: Optional[int] = None,
+        frame_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        period_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        checkpoint_dir: Optional[str] = None,
+        backend: Literal['matplotlib', 'raster'] = 'matplotlib'
+    ) -> Any:
         """
         Create an animated bar chart race using matplotlib.
         """
@@ -70,7 +76,8 @@ class _BCR:
             period_label, period_template, period_summary_func, perpendicular_bar_func,
             colors, title, bar_size, bar_textposition, bar_texttemplate,
             bar_label_font, tick_label_font, tick_template, shared_fontdict, scale,
-            fig, writer, bar_kwargs, fig_kwargs, filter_column_colors
+            fig, writer, bar_kwargs, fig_kwargs, filter_column_colors, output, step_budget,
+            frame_range, period_range, checkpoint_dir, backend
         )
 
     def bar_chart_race_plotly(
@@ -102,7 +109,10 @@ class _BCR:
         bar_kwargs: Optional[Dict[str, Any]] = None,
         layout_kwargs: Optional[Dict[str, Any]] = None,
         write_html_kwargs: Optional[Dict[str, Any]] = None,
-        filter_column_colors: bool = False
+        filter_column_colors: bool = False,
+        lazy_frames: Optional[Union[bool, int, Dict[str, Any]]] = None,
+        content_hash: bool = False,
+        output: Optional[Any] = None
     ) -> Any:
         """
         Create an animated bar chart race using plotly.
@@ -113,12 +123,12 @@ class _BCR:
             period_label, period_template, period_summary_func, perpendicular_bar_func,
             colors, title, bar_size, bar_textposition, bar_texttemplate, bar_label_font,
             tick_label_font, hovertemplate, slider, scale, bar_kwargs, layout_kwargs,
-            write_html_kwargs, filter_column_colors
+            write_html_kwargs, filter_column_colors, lazy_frames, content_hash, output
         )
 
     def line_chart_race(
         self,
-        filename: Optional[str] = None,
+        filename: Optional[Union[str, List[str]]] = None,
         n_lines: Optional[int] = None,
         steps_per_period: int = 10,
         period_length: int = 500,
@@ -142,8 +152,16 @@ class _BCR:
         fig: Optional[plt.Figure] = None,
         writer: Optional[Any] = None,
         line_kwargs: Optional[Dict[str, Any]] = None,
-        fig_kwargs: Optional[Dict[str, Any]] = None
-    ) -> Union[str, None]:
+        fig_kwargs: Optional[Dict[str, Any]] = None,
+        output: Optional[Any] = None,
+        step_budget: Optional[int] = None,
+        frame_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        period_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        checkpoint_dir: Optional[str] = None,
+        history_buffer: bool = False,
+        decimate: bool = False,
+        spread_labels: bool = False
+    ) -> Any:
         """
         Create an animated line chart race using matplotlib.
         """
@@ -152,7 +170,9 @@ class _BCR:
             period_summary_func, line_width_data, agg_line_func, agg_line_kwargs,
             others_line_func, others_line_kwargs, fade, min_fade, images, colors,
             title, line_label_font, tick_label_font, tick_template, shared_fontdict,
-            scale, fig, writer, line_kwargs, fig_kwargs
+            scale, fig, writer, line_kwargs, fig_kwargs, output, step_budget,
+            frame_range, period_range, checkpoint_dir, history_buffer, decimate,
+            spread_labels
         )
 
     def prepare_wide_data(
@@ -0,0 +1,193 @@
+import functools
+
+import numpy as np
+from matplotlib import artist as martist, colors as mcolors
+from matplotlib.backends.backend_agg import get_hinting_flag
+from matplotlib.font_manager import findfont, get_font
+
+
+class RasterFrame(martist.Artist):
+    '''
+    Artist drawing the whole figure from an (H, W, 4) uint8 RGBA array.
+
+    The array starts each frame as a copy of `background`, the figure
+    rendered once by matplotlib, and the chart then draws its rectangles
+    and text directly into it with the functions of this module. Saving
+    the figure only copies the array, so every writer works unchanged.
+    '''
+
+    def __init__(self, background):
+        super().__init__()
+        self.background = background
+        self.buf = background.copy()
+        self.set_zorder(np.inf)
+
+    def reset(self):
+        np.copyto(self.buf, self.background)
+        self.stale = True
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        if (renderer.width, renderer.height) != self.buf.shape[1::-1]:
+            raise ValueError('With `backend="raster"`, frames must be saved at the dpi '
+                             'of the figure')
+        gc = renderer.new_gc()
+        renderer.draw_image(gc, 0, 0, self.buf[::-1])
+        gc.restore()
+
+
+def get_clip(bbox, height):
+    # pixel columns and rows of a display bbox, rounded like Agg clip boxes
+    x0, y0, x1, y1 = bbox.extents
+    return (int(np.floor(x0 + .5)), int(np.floor(x1 + .5)),
+            int(np.floor(height - y1 + .5)), int(np.floor(height - y0 + .5)))
+
+
+def snap(value, lw):
+    # Agg moves the corners of rectilinear paths to pixel edges, or to pixel
+    # centers when the rounded line width is odd
+    offset = .5 if int(np.floor(lw + .5)) % 2 else 0
+    return np.floor(value + .5) + offset
+
+
+def coverage(lo, hi, start, stop):
+    # fraction of each pixel from start to stop covered by [lo, hi]
+    edges = np.arange(start, stop)
+    return np.clip(np.minimum(hi, edges + 1) - np.maximum(lo, edges), 0, 1)
+
+
+def blend(buf, cols, rows, alpha, color):
+    # composite color over the pixels with the given (rows, cols) alpha
+    region = buf[rows[0]:rows[1], cols[0]:cols[1]]
+    dst = region.astype(np.float32)
+    alpha = alpha[..., None] * color[3]
+    dst[..., :3] += (np.asarray(color[:3], np.float32) * 255 - dst[..., :3]) * alpha
+    dst[..., 3:] += (255 - dst[..., 3:]) * alpha
+    region[...] = dst + .5
+
+
+def box_bounds(box, clip):
+    # pixels touched by the box (x0, x1, y0, y1) inside the clip
+    x0, x1, y0, y1 = box
+    cols = max(int(np.floor(x0)), clip[0]), min(int(np.ceil(x1)), clip[1])
+    rows = max(int(np.floor(y0)), clip[2]), min(int(np.ceil(y1)), clip[3])
+    return cols, rows
+
+
+def box_coverage(box, cols, rows):
+    x0, x1, y0, y1 = box
+    if x1 <= x0 or y1 <= y0:
+        return np.zeros((rows[1] - rows[0], cols[1] - cols[0]))
+    return np.outer(coverage(y0, y1, *rows), coverage(x0, x1, *cols))
+
+
+def fill_box(buf, box, color, clip):
+    """
+    Fill the box (x0, x1, y0, y1) in pixel coordinates, with y growing
+    down, antialiased by the area covered in each pixel.
+    """
+    cols, rows = box_bounds(box, clip)
+    if cols[1] <= cols[0] or rows[1] <= rows[0] or color[3] == 0:
+        return
+    x0, x1, y0, y1 = box
+    # pixels fully inside an opaque box are set directly and only the
+    # partially covered ones around them are blended
+    inner_cols = max(int(np.ceil(x0)), cols[0]), min(int(np.floor(x1)), cols[1])
+    inner_rows = max(int(np.ceil(y0)), rows[0]), min(int(np.floor(y1)), rows[1])
+    if (color[3] < 1 or inner_cols[1] <= inner_cols[0]
+            or inner_rows[1] <= inner_rows[0]):
+        blend(buf, cols, rows, box_coverage(box, cols, rows), color)
+        return
+    buf[inner_rows[0]:inner_rows[1], inner_cols[0]:inner_cols[1]] = \
+        np.round(np.asarray(color) * 255).astype(np.uint8)
+    strips = [(cols, (rows[0], inner_rows[0])), (cols, (inner_rows[1], rows[1])),
+              ((cols[0], inner_cols[0]), inner_rows), ((inner_cols[1], cols[1]), inner_rows)]
+    for strip_cols, strip_rows in strips:
+        if strip_cols[1] > strip_cols[0] and strip_rows[1] > strip_rows[0]:
+            blend(buf, strip_cols, strip_rows,
+                  box_coverage(box, strip_cols, strip_rows), color)
+
+
+def draw_rect(buf, box, facecolor, edgecolor, lw, clip):
+    """
+    Draw a rectangle with a fill and an edge of width `lw` pixels centered
+    on its outline, snapped to the pixel grid like a Rectangle patch.
+    """
+    x0, x1, y0, y1 = (snap(v, lw) for v in box)
+    x0, x1 = min(x0, x1), max(x0, x1)
+    fill_box(buf, (x0, x1, y0, y1), facecolor, clip)
+    if lw <= 0 or edgecolor[3] == 0:
+        return
+    h = lw / 2
+    if x1 - x0 <= lw or y1 - y0 <= lw:
+        cols, rows = box_bounds((x0 - h, x1 + h, y0 - h, y1 + h), clip)
+        if cols[1] > cols[0] and rows[1] > rows[0]:
+            edge = (box_coverage((x0 - h, x1 + h, y0 - h, y1 + h), cols, rows)
+                    - box_coverage((x0 + h, x1 - h, y0 + h, y1 - h), cols, rows))
+            blend(buf, cols, rows, edge, edgecolor)
+        return
+    # the edge as four strips that tile the outline
+    for strip in [(x0 - h, x1 + h, y0 - h, y0 + h), (x0 - h, x1 + h, y1 - h, y1 + h),
+                  (x0 - h, x0 + h, y0 + h, y1 - h), (x1 - h, x1 + h, y0 + h, y1 - h)]:
+        fill_box(buf, strip, edgecolor, clip)
+
+
+def draw_vline(buf, x, lw, color, clip):
+    # a vertical line across the whole clip, snapped like a straight Line2D
+    x = snap(x, lw)
+    fill_box(buf, (x - lw / 2, x + lw / 2, clip[2], clip[3]), color, clip)
+
+
+@functools.lru_cache(maxsize=4096)
+def text_sprite(s, prop, dpi):
+    '''
+    Render a line of text with FreeType as RendererAgg does and return its
+    coverage image with the width, height, descent and bitmap offset used
+    to place it, in pixels. Labels repeat across frames, so the sprites of
+    recent strings are kept.
+    '''
+    font = get_font(findfont(prop))
+    font.clear()
+    font.set_size(prop.get_size_in_points(), dpi)
+    font.set_text(s, 0, flags=get_hinting_flag())
+    font.draw_glyphs_to_bitmap(antialiased=True)
+    w, h = font.get_width_height()
+    xo, yo = font.get_bitmap_offset()
+    image = np.asarray(font.get_image(), dtype=np.float32) / 255
+    return image, w / 64, h / 64, font.get_descent() / 64, xo / 64, yo / 64
+
+
+def draw_text(buf, text, s, x, y, dpi, clip=None):
+    """
+    Draw the string `s` with the font, color and alignment of the Text
+    `text`, anchored at the display point (x, y). The single unrotated line
+    is laid out like Text and blended at the same pixels as RendererAgg.
+    """
+    if not s:
+        return
+    prop = text.get_fontproperties()
+    image, w, h, d, xo, yo = text_sprite(s, prop, dpi)
+    _, _, lp_h, lp_d, _, _ = text_sprite('lp', prop, dpi)
+    # the height of a line is at least that of 'lp'
+    line_h, line_d = max(h, lp_h), max(d, lp_d)
+    ha, va = text.get_horizontalalignment(), text.get_verticalalignment()
+    offsetx = {'center': w / 2, 'right': w}.get(ha, 0)
+    offsety = {'center': -line_h / 2, 'top': 0, 'baseline': line_d - line_h,
+               'center_baseline': -(line_h - line_d) / 2}.get(va, -line_h)
+    # baseline in pixels with y growing down
+    x = x - offsetx
+    y = buf.shape[0] - (y - (line_h - line_d) - offsety)
+    left = round(x + xo)
+    bottom = round(y + yo + d) + 1
+
+    height, width = image.shape
+    clip = clip or (0, buf.shape[1], 0, buf.shape[0])
+    cols = max(left, clip[0]), min(left + width, clip[1])
+    rows = max(bottom - height, clip[2]), min(bottom, clip[3])
+    if cols[1] <= cols[0] or rows[1] <= rows[0]:
+        return
+    alpha = image[rows[0] - bottom + height:rows[1] - bottom + height,
+                  cols[0] - left:cols[1] - left]
+    color = mcolors.to_rgba(text.get_color(), text.get_alpha())
+    blend(buf, cols, rows, alpha, color)
@@ -0,0 +1,196 @@
+import logging
+import os
+import pickle
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from matplotlib import animation
+
+from ._utils import hash_content
+
+_log = logging.getLogger(__name__)
+
+SEGMENT_EXTENSIONS = ('mp4', 'm4v', 'mov', 'mkv')
+
+
+def render_segments(
+    race_func: Callable,
+    df: pd.DataFrame,
+    filename: str,
+    n_segments: int = 4,
+    max_workers: Optional[int] = None,
+    retries: int = 1,
+    segment_dir: Optional[str] = None,
+    keep_segments: bool = False,
+    **kwargs: Any
+) -> None:
+    """
+    Render a race as several video segments and join them into one file.
+
+    The periods of `df` are split into `n_segments` consecutive ranges,
+    each saved to its own video by `race_func` with the same parameters,
+    so that every segment is encoded with the same settings. The segments
+    are then joined with ffmpeg's concat demuxer, copying the encoded
+    video without encoding it again.
+
+    Segments are rendered at the same time by a pool of worker processes.
+    A segment is only kept once it has been saved completely, under a name
+    derived from a hash of `df` and the parameters. A segment that fails is
+    rendered again up to `retries` times, and calling this function again
+    with the same arguments only renders the segments that are missing.
+
+    Parameters
+    ----------
+    race_func : callable
+        `bar_chart_race` or `line_chart_race`.
+    df : pd.DataFrame
+        The data passed to `race_func`.
+    filename : str
+        Name of the video file, ending in '.mp4', '.m4v', '.mov' or '.mkv'.
+    n_segments : int, default 4
+        Number of segments. It is reduced to the number of periods when
+        `df` has fewer rows.
+    max_workers : int, default None
+        Number of worker processes. Defaults to the number of CPUs. With 1,
+        the segments are rendered one after the other in this process.
+        Worker processes receive `race_func` and `kwargs` pickled, so 
+        lambdas and functions defined inside other functions, for instance 
+        as `tick_template` or `period_summary_func`, cannot be sent to 
+        them. The segments are then rendered in this process, with a 
+        warning. Define such functions at the top level of a module instead.
+    retries : int, default 1
+        Number of times a failed segment is rendered again before its error
+        is raised.
+    segment_dir : str, default None
+        Directory of the segment files. Defaults to a directory named after
+        `filename` with '_segments' appended, next to it.
+    keep_segments : bool, default False
+        Whether to keep the segment files after joining them.
+    **kwargs
+        Other parameters of `race_func`, except `filename`, `output`,
+        `frame_range` and `period_range`.
+
+    Returns
+    -------
+    None
+    """
+    path = Path(filename)
+    validate_segment_params(path, n_segments, max_workers, retries, kwargs)
+    if segment_dir is None:
+        segment_dir = path.with_name(f'{path.stem}_segments')
+    segment_dir = Path(segment_dir)
+    segment_dir.mkdir(parents=True, exist_ok=True)
+
+    if max_workers != 1 and not is_picklable((race_func, kwargs)):
+        _log.warning('The parameters cannot be pickled for worker processes, as with '
+                     'lambdas or local functions, so the segments are rendered one '
+                     'after the other in this process')
+        max_workers = 1
+
+    bounds = get_segment_bounds(len(df), n_segments)
+    digest = hash_content(df, dict(kwargs, race_func=race_func, bounds=bounds))[:16]
+    ext = path.suffix
+    paths = [segment_dir / f'{digest}_{k:03d}{ext}' for k in range(len(bounds))]
+    pending = [k for k, p in enumerate(paths) if not p.exists()]
+    if len(pending) < len(paths):
+        _log.info('Reusing %d of %d segments already rendered',
+                  len(paths) - len(pending), len(paths))
+
+    for attempt in range(retries + 1):
+        errors = run_segments(race_func, df, [(paths[k], bounds[k]) for k in pending],
+                              max_workers, kwargs)
+        pending = [k for k, e in zip(pending, errors) if e is not None]
+        if not pending:
+            break
+        errors = [e for e in errors if e is not None]
+        _log.warning('%d segments failed, the first with %r', len(errors), errors[0])
+    else:
+        raise errors[0]
+
+    concat_segments(paths, path, segment_dir / f'{digest}.txt')
+    if not keep_segments:
+        for p in paths:
+            p.unlink()
+        try:
+            segment_dir.rmdir()
+        except OSError:
+            # holds other files
+            pass
+
+
+def validate_segment_params(path, n_segments, max_workers, retries, kwargs):
+    if path.suffix[1:] not in SEGMENT_EXTENSIONS:
+        raise ValueError(f'`filename` must end in one of {SEGMENT_EXTENSIONS}')
+    if not isinstance(n_segments, (int, np.integer)) or n_segments < 1:
+        raise ValueError('`n_segments` must be a positive integer')
+    if max_workers is not None and max_workers < 1:
+        raise ValueError('`max_workers` must be None or a positive integer')
+    if retries < 0:
+        raise ValueError('`retries` must be a non-negative integer')
+    for name in ('filename', 'output', 'frame_range', 'period_range'):
+        if name in kwargs:
+            raise TypeError(f'`{name}` is set by render_segments and cannot be passed')
+
+
+def is_picklable(value):
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def get_segment_bounds(n_periods: int, n_segments: int) -> List[Tuple[int, Optional[int]]]:
+    # consecutive period ranges of nearly equal length, the last one open
+    n_segments = min(n_segments, n_periods)
+    starts = np.linspace(0, n_periods, n_segments + 1).round().astype(int)[:-1].tolist()
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def run_segments(race_func, df, segments, max_workers, kwargs):
+    # error raised by each segment, None for those that were saved
+    if not segments:
+        return []
+    if max_workers == 1 or len(segments) == 1:
+        errors = []
+        for path, period_range in segments:
+            try:
+                render_segment(race_func, df, path, period_range, kwargs)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(segments))
+    with ProcessPoolExecutor(max_workers) as pool:
+        futures = [pool.submit(render_segment, race_func, df, path, period_range, kwargs)
+                   for path, period_range in segments]
+        # a worker that dies also fails the segments after it, retried as well
+        return [f.exception() for f in futures]
+
+
+def render_segment(race_func, df, path, period_range, kwargs):
+    # saved under a temporary name so that an interrupted segment is never reused
+    tmp_path = path.with_name(f'{path.stem}.tmp{path.suffix}')
+    race_func(df, str(tmp_path), period_range=period_range, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def concat_segments(paths, path, list_path):
+    with open(list_path, 'w') as f:
+        for p in paths:
+            quoted = str(p.resolve()).replace("'", "'\\''")
+            f.write(f"file '{quoted}'\n")
+    args = [animation.FFMpegWriter.bin_path(), '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', str(list_path), '-c', 'copy']
+    if path.suffix[1:] in ('mp4', 'm4v', 'mov'):
+        args += ['-movflags', '+faststart']
+    try:
+        subprocess.run(args + [str(path)], check=True, capture_output=True)
+    finally:
+        list_path.unlink()
@@ -1,9 +1,14 @@
+import hashlib
+import io
+import pickle
+import types
 from pathlib import Path
 from typing import Dict, List, Literal, Optional, Tuple, Union, Any, Callable
 
 import pandas as pd
 import numpy as np
 import PIL
+from matplotlib.figure import Figure
 import urllib
 
 
@@ -319,4 +324,116 @@ def read_images(filename: str, columns: List[str]) -> Dict[str, np.ndarray]:
         except Exception as e:
             raise ValueError(f"Failed to read image for column '{col}': {e}")
 
-    return image_dict
\ No newline at end of file
+    return image_dict
+
+def is_file_like(obj: Any) -> bool:
+    '''
+    Return whether `obj` can be written to like an open file.
+    '''
+    return hasattr(obj, 'write')
+
+
+def hash_content(df: pd.DataFrame, params: Dict[str, Any]) -> str:
+    """
+    Return a hex digest of a DataFrame and the parameters used to animate it.
+
+    The digest only depends on the contents of its inputs, so equal inputs
+    produce the same digest in every session. Functions are hashed by their
+    name, bytecode, constants, defaults and closure values, along with the
+    functions and values they look up in their module, and matplotlib 
+    figures by the pixels they draw. The version of
+    bar_chart_racer is hashed too, so output saved by another version is
+    never reused.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame passed to the animation function
+    params : Dict[str, Any]
+        Mapping of parameter names to values
+
+    Returns
+    -------
+    str
+        SHA-256 hex digest
+    """
+    from . import __version__
+
+    digest = hashlib.sha256(__version__.encode())
+    digest.update(_content_bytes(df))
+    for key in sorted(params):
+        digest.update(key.encode())
+        digest.update(_content_bytes(params[key]))
+    return digest.hexdigest()
+
+
+# functions being hashed, which their helpers may refer back to
+_hashing_functions = []
+
+
+def _global_values(func: types.FunctionType) -> Dict[str, Any]:
+    # helpers and values a function looks up in its module when called, 
+    # leaving out modules, classes and builtins. Functions imported from 
+    # other modules are only named, so libraries are not hashed in full
+    names = set()
+    codes = [func.__code__]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+    values = {}
+    for name in sorted(names):
+        if name in func.__globals__:
+            value = func.__globals__[name]
+            if isinstance(value, (types.ModuleType, type, types.BuiltinFunctionType)):
+                continue
+            module = getattr(value, '__module__', None)
+            if callable(value) and module != func.__module__:
+                value = f'{module}.{getattr(value, "__qualname__", name)}'
+            values[name] = value
+    return values
+
+
+def _content_bytes(value: Any) -> bytes:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        meta = repr((list(labels), value.index.name, [str(d) for d in np.atleast_1d(value.dtypes)]))
+        return pd.util.hash_pandas_object(value, index=True).values.tobytes() + meta.encode()
+    if isinstance(value, np.ndarray):
+        return f'{value.dtype}{value.shape}'.encode() + np.ascontiguousarray(value).tobytes()
+    if isinstance(value, dict):
+        items = (_content_bytes(k) + b':' + _content_bytes(v) for k, v in value.items())
+        return b'{' + b','.join(items) + b'}'
+    if isinstance(value, (list, tuple)):
+        return b'[' + b','.join(_content_bytes(v) for v in value) + b']'
+    if isinstance(value, types.CodeType):
+        return (value.co_code + repr(value.co_names).encode() 
+                + _content_bytes(value.co_consts))
+    if isinstance(value, types.FunctionType):
+        if value in _hashing_functions:
+            # a function calling itself, directly or through its helpers
+            return value.__qualname__.encode()
+        _hashing_functions.append(value)
+        try:
+            closure = [cell.cell_contents for cell in value.__closure__ or ()]
+            return (value.__qualname__.encode() + _content_bytes(value.__code__)
+                    + _content_bytes(value.__defaults__) + _content_bytes(closure)
+                    + _content_bytes(_global_values(value)))
+        finally:
+            _hashing_functions.pop()
+    if hasattr(value, 'to_plotly_json'):
+        return _content_bytes(value.to_plotly_json())
+    if isinstance(value, Figure):
+        # its repr only gives the size, so the figure is hashed as drawn
+        buf = io.BytesIO()
+        value.savefig(buf, format='rgba')
+        return f'Figure{tuple(value.get_size_inches())}{value.dpi}'.encode() + buf.getvalue()
+
+    text = repr(value)
+    if ' at 0x' in text:
+        # default repr contains the memory address, which changes every session
+        try:
+            return pickle.dumps(value)
+        except Exception:
+            return type(value).__qualname__.encode()
+    return text.encode()
@@ -0,0 +1,1010 @@
+import json
+import os
+import queue
+import re
+import struct
+import subprocess
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+from matplotlib import animation
+from matplotlib import colors as mcolors
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image, GifImagePlugin
+
+from ._utils import is_file_like
+
+# printf-style field for the frame number in the filename of a frame sequence
+FRAME_FIELD = re.compile(r'%\d*d')
+
+
+def grab_buffer(fig, dpi=None, facecolor=None):
+    '''
+    Render the figure and return it as an (H, W, 4) uint8 RGBA array.
+
+    The buffer of the Agg canvas is read directly, which avoids the extra
+    render and copy done by `savefig`. Figures without a canvas of their
+    own are drawn with an Agg canvas that is detached again afterwards, so
+    that `draw_idle`, called by the animation after every frame, does not
+    draw the figure a second time. `savefig` is only used when a dpi
+    different from the figure's is requested or the figure belongs to a
+    GUI canvas that does not expose its buffer.
+    '''
+    orig_canvas = fig.canvas
+    if type(orig_canvas) is FigureCanvasBase:
+        # an animation being saved ignores draw events of a saving canvas,
+        # otherwise the first one runs its init_func again
+        FigureCanvasAgg(fig)._is_saving = orig_canvas.is_saving()
+    try:
+        return draw_buffer(fig, dpi, facecolor)
+    finally:
+        if fig.canvas is not orig_canvas:
+            fig.set_canvas(orig_canvas)
+
+
+def draw_buffer(fig, dpi, facecolor):
+    if (dpi is not None and dpi != fig.dpi) or not hasattr(fig.canvas, 'buffer_rgba'):
+        buf = BytesIO()
+        fig.savefig(buf, format='rgba', dpi=dpi, facecolor=facecolor)
+        dpi = dpi or fig.dpi
+        w, h = fig.get_size_inches()
+        shape = int(h * dpi + 1e-8), int(w * dpi + 1e-8), 4
+        return np.frombuffer(buf.getbuffer(), np.uint8).reshape(shape)
+
+    if facecolor is not None:
+        orig_facecolor = fig.get_facecolor()
+        fig.set_facecolor(facecolor)
+    try:
+        fig.canvas.draw()
+    finally:
+        if facecolor is not None:
+            fig.set_facecolor(orig_facecolor)
+    return np.asarray(fig.canvas.buffer_rgba()).copy()
+
+
+class BufferWriter(animation.AbstractMovieWriter):
+    '''
+    Base class for writers that encode frames in-process.
+
+    Instead of saving each frame with `savefig`, the RGBA buffer of the
+    canvas is passed to `write_frame` as an (H, W, 4) uint8 array along
+    with the duration of the frame in milliseconds. Subclasses open their
+    output in `setup` and implement `write_frame` and `finish`. The output
+    may be a file-like object instead of a filename.
+
+    Frames last ``1000 / fps`` milliseconds unless `frame_durations` is set 
+    to a list with the duration of each grabbed frame, which lets a pause 
+    be written from a single drawing of the figure.
+    '''
+
+    frame_durations = None
+
+    def setup(self, fig, outfile, dpi=None):
+        if is_file_like(outfile):
+            # there is no directory to check for file-like objects
+            self.outfile = outfile
+            self.fig = fig
+            self.dpi = fig.dpi if dpi is None else dpi
+        else:
+            super().setup(fig, outfile, dpi)
+        self.frame_duration = 1000 / self.fps
+        self._frame_number = 0
+
+    def next_duration(self):
+        k = self._frame_number
+        self._frame_number += 1
+        if self.frame_durations is None or k >= len(self.frame_durations):
+            return self.frame_duration
+        return self.frame_durations[k]
+
+    def grab_frame(self, **savefig_kwargs):
+        buf = grab_buffer(self.fig, self.dpi, savefig_kwargs.get('facecolor'))
+        self.write_frame(buf, self.next_duration())
+
+    def write_frame(self, buf, duration):
+        raise NotImplementedError('`write_frame` must be implemented by subclasses')
+
+
+class DeltaWriter(BufferWriter):
+    '''
+    Base class for animated image writers that store only the rectangle
+    that changed since the previous frame.
+
+    Frames identical to the previous one extend its duration instead of
+    being written again. Each rectangle is compressed by `encode` on a
+    thread pool while the next frames are drawn, and the results are
+    written in order by `write_encoded`. Subclasses also implement
+    `write_header` and `write_trailer`, and may override `prepare` to
+    convert the RGBA buffer to the array that is compared and cropped.
+
+    Parameters
+    ----------
+    fps : int, default 5
+        Frames per second
+
+    max_workers : int, default None
+        Number of threads compressing frames. Defaults to the number of CPUs.
+    '''
+
+    # offsets of the rectangles are rounded down to a multiple of this
+    offset_multiple = 1
+
+    # formats whose header is completed at the end are assembled in memory
+    # when written to a file-like object, as it might not be able to seek
+    needs_seek = False
+
+    def __init__(self, fps=5, max_workers=None, metadata=None):
+        super().__init__(fps=fps, metadata=metadata)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi)
+        if is_file_like(outfile):
+            self._file = BytesIO() if self.needs_seek else outfile
+        else:
+            self._file = open(outfile, 'wb')
+        self._pool = ThreadPoolExecutor(self.max_workers)
+        self._queue = deque()
+        self._prev = None
+        self._pending = None
+        self._elapsed = 0
+        self._written = 0
+
+    def prepare(self, buf):
+        return buf[..., :3]
+
+    def encode(self, arr, offset):
+        raise NotImplementedError('`encode` must be implemented by subclasses')
+
+    def write_header(self, width, height):
+        raise NotImplementedError('`write_header` must be implemented by subclasses')
+
+    def write_encoded(self, data, offset, size, duration):
+        raise NotImplementedError('`write_encoded` must be implemented by subclasses')
+
+    def write_trailer(self):
+        raise NotImplementedError('`write_trailer` must be implemented by subclasses')
+
+    def write_frame(self, buf, duration):
+        arr = self.prepare(buf)
+        if self._prev is None:
+            self.write_header(arr.shape[1], arr.shape[0])
+            y0, y1, x0, x1 = 0, arr.shape[0], 0, arr.shape[1]
+        else:
+            changed = arr != self._prev
+            if changed.ndim == 3:
+                changed = changed.any(axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            if len(rows) == 0:
+                self._pending[3] += duration
+                return
+            cols = np.flatnonzero(changed.any(axis=0))
+            y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            x0 -= x0 % self.offset_multiple
+            y0 -= y0 % self.offset_multiple
+
+        self.submit_pending()
+        crop = np.ascontiguousarray(arr[y0:y1, x0:x1])
+        offset = int(x0), int(y0)
+        future = self._pool.submit(self.encode, crop, offset)
+        self._pending = [future, offset, (int(x1 - x0), int(y1 - y0)), duration]
+        self._prev = arr
+
+    def submit_pending(self):
+        # the duration of a frame is only final once a different frame arrives
+        if self._pending is not None:
+            self._queue.append(self._pending)
+            self._pending = None
+        while len(self._queue) > 2 * self.max_workers:
+            self.write_next()
+
+    def write_next(self):
+        future, offset, size, duration = self._queue.popleft()
+        self.write_encoded(future.result(), offset, size, duration)
+
+    def to_ticks(self, duration, tick=1, minimum=0):
+        # carry the rounding error forward so the total length stays exact
+        self._elapsed += duration
+        ticks = max(minimum, round(self._elapsed / tick) - self._written)
+        self._written += ticks
+        return ticks
+
+    def finish(self):
+        try:
+            self.submit_pending()
+            while self._queue:
+                self.write_next()
+            self.write_trailer()
+            if self._file is not self.outfile and is_file_like(self.outfile):
+                self.outfile.write(self._file.getvalue())
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+            if self._file is not self.outfile:
+                self._file.close()
+
+
+class GifWriter(DeltaWriter):
+    '''
+    In-process animated GIF writer.
+
+    All frames share one global palette made from `colors`, the colors known
+    to appear in the animation, topped up with the colors of the first frame.
+    Each frame is mapped onto that palette and only the rectangle that
+    changed since the previous frame is written. Frames identical to the
+    previous one extend its duration instead of being written again.
+
+    Parameters
+    ----------
+    fps : int, default 5
+        Frames per second
+
+    colors : list of colors, default None
+        Colors known to appear in the animation, i.e. bar, line, text
+        and background colors. Any matplotlib color specification.
+
+    loop : int, default 0
+        Number of times to loop the animation. 0 loops forever.
+
+    max_workers : int, default None
+        Number of threads compressing frames. Defaults to the number of CPUs.
+    '''
+
+    def __init__(self, fps=5, colors=None, loop=0, max_workers=None, metadata=None):
+        super().__init__(fps=fps, max_workers=max_workers, metadata=metadata)
+        self.colors = colors
+        self.loop = loop
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi)
+        self._palette = None
+        self._lut = None
+
+    def build_palette(self, rgb):
+        known = np.zeros((0, 3), dtype=np.uint8)
+        if self.colors is not None and len(self.colors):
+            known = mcolors.to_rgba_array(self.colors)[:, :3]
+            known = np.unique(np.round(known * 255).astype(np.uint8), axis=0)[:256]
+
+        n_free = 256 - len(known)
+        if n_free > 0:
+            img = Image.fromarray(np.ascontiguousarray(rgb))
+            quantized = img.quantize(n_free, method=Image.Quantize.MEDIANCUT)
+            n_used = len(quantized.getcolors(n_free))
+            first_frame = np.array(quantized.getpalette()[:3 * n_used], dtype=np.uint8)
+            known = np.vstack((known, first_frame.reshape(-1, 3)))
+
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        palette[:len(known)] = known
+        return palette, len(known)
+
+    def map_colors(self, rgb):
+        # 6 bits per channel index a lookup table filled in as new colors appear
+        rgb6 = (rgb >> 2).astype(np.int32)
+        key = (rgb6[..., 0] << 12) | (rgb6[..., 1] << 6) | rgb6[..., 2]
+        idx = self._lut[key]
+        missing = idx < 0
+        if missing.any():
+            new_keys, first = np.unique(key[missing], return_index=True)
+            new_colors = rgb[missing][first].astype(np.int32)
+            palette = self._palette[:self._n_colors].astype(np.int32)
+            dist = ((new_colors[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+            self._lut[new_keys] = dist.argmin(axis=1)
+            idx = self._lut[key]
+        return idx.astype(np.uint8)
+
+    def prepare(self, buf):
+        rgb = buf[..., :3]
+        if self._palette is None:
+            self._palette, self._n_colors = self.build_palette(rgb)
+            self._lut = np.full(1 << 18, -1, dtype=np.int16)
+        return self.map_colors(rgb)
+
+    def write_header(self, width, height):
+        header = (b'GIF89a' + width.to_bytes(2, 'little') + height.to_bytes(2, 'little')
+                  # global color table of 256 entries, background index 0, no aspect ratio
+                  + bytes([0xF7, 0, 0]) + self._palette.tobytes()
+                  # NETSCAPE2.0 application extension for looping
+                  + b'!\xff\x0bNETSCAPE2.0\x03\x01' + self.loop.to_bytes(2, 'little') + b'\x00')
+        self._file.write(header)
+
+    def encode(self, idx, offset):
+        img = Image.frombytes('P', (idx.shape[1], idx.shape[0]), idx.tobytes())
+        return b''.join(GifImagePlugin.getdata(img, offset))
+
+    def write_encoded(self, data, offset, size, duration):
+        # GIF delays are in hundredths of a second. Browsers slow down delays
+        # below 2/100 of a second, so those are raised to 2.
+        delay = self.to_ticks(duration, tick=10, minimum=2)
+        # graphic control extension with disposal 1, which leaves the frame
+        # in place so the next rectangle is drawn over it
+        gce = b'!\xf9\x04\x04' + delay.to_bytes(2, 'little') + b'\x00\x00'
+        self._file.write(gce + data)
+
+    def write_trailer(self):
+        self._file.write(b';')
+
+
+class APNGWriter(DeltaWriter):
+    '''
+    In-process animated PNG writer.
+
+    Frames are stored losslessly as 8-bit RGB. Only the rectangle that
+    changed since the previous frame is written and frames identical to the
+    previous one extend its duration. Rectangles are deflated on a thread
+    pool as zlib releases the GIL.
+
+    Parameters
+    ----------
+    fps : int, default 5
+        Frames per second
+
+    loop : int, default 0
+        Number of times to loop the animation. 0 loops forever.
+
+    compress_level : int, default 6
+        zlib compression level from 0 to 9
+
+    max_workers : int, default None
+        Number of threads compressing frames. Defaults to the number of CPUs.
+    '''
+
+    needs_seek = True
+
+    def __init__(self, fps=5, loop=0, compress_level=6, max_workers=None, metadata=None):
+        super().__init__(fps=fps, max_workers=max_workers, metadata=metadata)
+        self.loop = loop
+        self.compress_level = compress_level
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi)
+        self._sequence = 0
+        self._n_frames = 0
+
+    def write_chunk(self, tag, data):
+        self._file.write(png_chunk(tag, data))
+
+    def actl(self, n_frames):
+        return struct.pack('>II', n_frames, self.loop)
+
+    def write_header(self, width, height):
+        self._file.write(PNG_SIGNATURE + png_ihdr(width, height))
+        # the number of frames is only known at the end and filled in then
+        self._actl_pos = self._file.tell()
+        self.write_chunk(b'acTL', self.actl(0))
+
+    def encode(self, rgb, offset):
+        return deflate_rgb(rgb, self.compress_level)
+
+    def write_encoded(self, data, offset, size, duration):
+        delay, denominator = self.to_ticks(duration), 1000
+        if delay > 0xFFFF:
+            delay, denominator = min(round(delay / 1000), 0xFFFF), 1
+        # dispose op 0 keeps the frame, blend op 0 replaces the rectangle
+        fctl = struct.pack('>IIIIIHHBB', self._sequence, *size, *offset, 
+                           delay, denominator, 0, 0)
+        self.write_chunk(b'fcTL', fctl)
+        if self._n_frames == 0:
+            self.write_chunk(b'IDAT', data)
+            self._sequence += 1
+        else:
+            self.write_chunk(b'fdAT', struct.pack('>I', self._sequence + 1) + data)
+            self._sequence += 2
+        self._n_frames += 1
+
+    def write_trailer(self):
+        self.write_chunk(b'IEND', b'')
+        self._file.seek(self._actl_pos)
+        self.write_chunk(b'acTL', self.actl(self._n_frames))
+
+
+class WebPWriter(DeltaWriter):
+    '''
+    In-process animated WebP writer.
+
+    Only the rectangle that changed since the previous frame is written
+    and frames identical to the previous one extend its duration. Each
+    rectangle is encoded by libwebp on a thread pool, which releases the GIL,
+    and the frames are assembled into an animated WebP container.
+
+    Parameters
+    ----------
+    fps : int, default 5
+        Frames per second
+
+    loop : int, default 0
+        Number of times to loop the animation. 0 loops forever.
+
+    lossless : bool, default True
+        Use lossless compression. Charts are mostly flat color and text,
+        which lossless WebP stores compactly and without artifacts.
+
+    quality : int, default 80
+        Quality from 0 to 100. For lossy compression, higher values give
+        better images. For lossless compression, higher values spend more
+        time to get smaller files.
+
+    max_workers : int, default None
+        Number of threads compressing frames. Defaults to the number of CPUs.
+    '''
+
+    # WebP frame offsets are stored divided by two
+    offset_multiple = 2
+    needs_seek = True
+
+    def __init__(self, fps=5, loop=0, lossless=True, quality=80, max_workers=None, 
+                 metadata=None):
+        super().__init__(fps=fps, max_workers=max_workers, metadata=metadata)
+        self.loop = loop
+        self.lossless = lossless
+        self.quality = quality
+
+    def write_header(self, width, height):
+        # the size of the RIFF container is filled in at the end
+        self._file.write(b'RIFF\x00\x00\x00\x00WEBP')
+        # VP8X with the animation flag set, followed by the canvas size minus one
+        vp8x = bytes([0x02, 0, 0, 0]) + uint24(width - 1) + uint24(height - 1)
+        self.write_chunk(b'VP8X', vp8x)
+        # white background color as BGRA and the loop count
+        self.write_chunk(b'ANIM', b'\xff\xff\xff\xff' + struct.pack('<H', self.loop))
+
+    def write_chunk(self, tag, data):
+        self._file.write(tag + struct.pack('<I', len(data)) + data + b'\x00' * (len(data) & 1))
+
+    def encode(self, rgb, offset):
+        buf = BytesIO()
+        Image.fromarray(rgb).save(buf, 'WEBP', lossless=self.lossless, quality=self.quality)
+        # keep the bitstream chunks of the still image, dropping its RIFF header
+        data, frame = buf.getvalue(), []
+        i = 12
+        while i < len(data):
+            tag, size = data[i:i + 4], struct.unpack('<I', data[i + 4:i + 8])[0]
+            end = i + 8 + size + (size & 1)
+            if tag in (b'ALPH', b'VP8 ', b'VP8L'):
+                frame.append(data[i:end])
+            i = end
+        return b''.join(frame)
+
+    def write_encoded(self, data, offset, size, duration):
+        delay = min(self.to_ticks(duration), 0xFFFFFF)
+        # flags 0x02: do not blend with the previous frame and do not dispose
+        anmf = (uint24(offset[0] // 2) + uint24(offset[1] // 2) + uint24(size[0] - 1) 
+                + uint24(size[1] - 1) + uint24(delay) + b'\x02' + data)
+        self.write_chunk(b'ANMF', anmf)
+
+    def write_trailer(self):
+        riff_size = self._file.tell() - 8
+        self._file.seek(4)
+        self._file.write(struct.pack('<I', riff_size))
+
+
+class FrameSequenceWriter(BufferWriter):
+    '''
+    Writes every frame to its own PNG file.
+
+    The output filename is a pattern containing a printf-style field for
+    the frame number such as 'frames/%05d.png'. Frames are compressed and
+    written on a thread pool while the next frames are drawn. A JSON
+    manifest mapping each frame to its file, period and start time in
+    milliseconds is written next to the frames when finished.
+
+    Parameters
+    ----------
+    fps : int, default None
+        Frames per second. When None, the fps of the chart saving the 
+        frames is used, or 5 outside of a chart.
+
+    skip_existing : bool, default False
+        Do not draw or write frames whose file already exists.
+
+    manifest : str or None, default 'manifest.json'
+        Name of the manifest file, placed in the directory of the frames.
+        Use None to not write a manifest.
+
+    periods : list, default None
+        Period of each frame written to the manifest. Set by the chart
+        when not given.
+
+    compress_level : int, default 6
+        zlib compression level from 0 to 9
+
+    max_workers : int, default None
+        Number of threads compressing frames. Defaults to the number of CPUs.
+    '''
+
+    def __init__(self, fps=None, skip_existing=False, manifest='manifest.json', periods=None, 
+                 compress_level=6, max_workers=None, metadata=None):
+        super().__init__(fps=fps, metadata=metadata)
+        self.skip_existing = skip_existing
+        self.manifest = manifest
+        self.periods = periods
+        self.compress_level = compress_level
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def setup(self, fig, outfile, dpi=None):
+        if is_file_like(outfile):
+            raise ValueError('Frame sequences can only be written to files')
+        self.directory = os.path.dirname(outfile)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        if self.fps is None:
+            self.fps = 5
+        super().setup(fig, outfile, dpi)
+        # any other '%' is part of the name
+        self._pattern = re.sub(r'%(?!\d*d)', '%%', outfile)
+        self._pool = ThreadPoolExecutor(self.max_workers)
+        self._queue = deque()
+        self._frames = []
+
+    def grab_frame(self, **savefig_kwargs):
+        paths = self.next_paths(self.next_duration())
+        if self.skip_existing and all(os.path.exists(path) for path in paths):
+            return
+        buf = grab_buffer(self.fig, self.dpi, savefig_kwargs.get('facecolor'))
+        self.write_paths(buf, paths)
+
+    def write_frame(self, buf, duration):
+        self.write_paths(buf, self.next_paths(duration))
+
+    def next_paths(self, duration):
+        # a frame lasting several frame durations is written to as many files
+        paths = []
+        for _ in range(n_repeats(duration, self.fps)):
+            paths.append(self._pattern % len(self._frames))
+            self._frames.append(paths[-1])
+        return paths
+
+    def write_paths(self, buf, paths):
+        self._queue.append(self._pool.submit(write_png, paths, buf[..., :3], self.compress_level))
+        while len(self._queue) > 2 * self.max_workers:
+            self._queue.popleft().result()
+
+    def write_manifest(self):
+        frames = []
+        for i, path in enumerate(self._frames):
+            frame = {'index': i, 'file': os.path.basename(path), 'time': i * self.frame_duration}
+            if self.periods is not None and i < len(self.periods):
+                frame['period'] = self.periods[i]
+            frames.append(frame)
+        manifest = {'fps': self.fps, 'frame_duration': self.frame_duration, 
+                    'n_frames': len(frames), 'frames': frames}
+        with open(os.path.join(self.directory, self.manifest), 'w') as f:
+            json.dump(manifest, f, indent=1)
+
+    def finish(self):
+        try:
+            while self._queue:
+                self._queue.popleft().result()
+            if self.manifest:
+                self.write_manifest()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+
+
+class PipelinedWriter(BufferWriter):
+    '''
+    Draws frames on the calling thread while another thread passes the
+    previous ones to the encoder.
+
+    Drawn RGBA buffers are put on a bounded queue that a writer thread
+    drains into `writer`, so drawing and encoding overlap and the total
+    time approaches the slower of the two instead of their sum.
+
+    Parameters
+    ----------
+    writer : writer instance
+        Writer accepting RGBA buffers, either one of the in-process writers
+        of this package or a matplotlib pipe-based writer such as
+        `FFMpegWriter`.
+
+    queue_size : int, default 8
+        Maximum number of drawn frames waiting to be encoded. Each frame 
+        takes width * height * 4 bytes of memory.
+    '''
+
+    def __init__(self, writer, queue_size=8):
+        if not supports_buffers(writer):
+            raise TypeError('`writer` must be one of the in-process writers or a '
+                            'pipe-based matplotlib MovieWriter')
+        if queue_size < 1:
+            raise ValueError('`queue_size` must be a positive integer')
+        super().__init__(fps=writer.fps, metadata=writer.metadata)
+        self.writer = writer
+        self.queue_size = queue_size
+
+    def _supports_transparency(self):
+        return self.writer._supports_transparency()
+
+    @property
+    def frame_size(self):
+        return self.writer.frame_size
+
+    def setup(self, fig, outfile, dpi=None):
+        self.writer.setup(fig, outfile, dpi)
+        self.outfile = outfile
+        self.fig = fig
+        self.dpi = self.writer.dpi
+        self.frame_duration = 1000 / self.fps
+        self._frame_number = 0
+        self._queue = queue.Queue(self.queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self.drain, daemon=True)
+        self._thread.start()
+
+    def drain(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            # keep draining after an error so the drawing thread never blocks
+            if self._error is None:
+                try:
+                    write_buffer(self.writer, *item)
+                except BaseException as e:
+                    self._error = e
+
+    def raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def grab_frame(self, **savefig_kwargs):
+        self.raise_error()
+        super().grab_frame(**savefig_kwargs)
+
+    def write_frame(self, buf, duration):
+        # blocks while the queue is full
+        self.raise_error()
+        self._queue.put((buf, duration))
+
+    def finish(self):
+        self._queue.put(None)
+        self._thread.join()
+        # an error of the encoder itself explains a failed write best
+        self.writer.finish()
+        self.raise_error()
+
+
+class TeeWriter(BufferWriter):
+    '''
+    Encodes each frame to several outputs from a single drawing of the 
+    figure.
+
+    Writers accepting RGBA buffers all receive the same buffer, each 
+    through its own `PipelinedWriter` so that the encoders run 
+    concurrently, and a `FrameSequenceWriter` compresses it on its own 
+    thread pool. Writers drawing at another dpi, such as a `ResizeWriter` 
+    given a `dpi`, share a buffer drawn at that dpi. Any other writer 
+    grabs the frame itself, which draws the figure again for that writer.
+
+    Parameters
+    ----------
+    writers : list of writer instances
+        One writer for each output. The `outfile` given to `setup` must be 
+        a list of the same length.
+
+    queue_size : int, default 8
+        Maximum number of drawn frames waiting to be encoded by each writer.
+    '''
+
+    def __init__(self, writers, queue_size=8):
+        if not writers:
+            raise ValueError('`writers` must contain at least one writer')
+        super().__init__(fps=writers[0].fps, metadata=writers[0].metadata)
+        self.writers = list(writers)
+        self.queue_size = queue_size
+
+    def _supports_transparency(self):
+        return all(writer._supports_transparency() for writer in self.writers)
+
+    def setup(self, fig, outfile, dpi=None):
+        if len(outfile) != len(self.writers):
+            raise ValueError('`outfile` must be a list with one output for each writer')
+        self.outfile = outfile
+        self.fig = fig
+        self.dpi = fig.dpi if dpi is None else dpi
+        self.frame_duration = 1000 / self.fps
+        self._frame_number = 0
+        self._writers = []
+        for writer, out in zip(self.writers, outfile):
+            if supports_buffers(writer):
+                writer = PipelinedWriter(writer, self.queue_size)
+            writer.setup(fig, out, self.dpi)
+            self._writers.append(writer)
+
+    def grab_frame(self, **savefig_kwargs):
+        # writers drawing at the same dpi share one buffer
+        duration = self.next_duration()
+        bufs = {}
+        for writer in self._writers:
+            if isinstance(writer, BufferWriter):
+                if writer.dpi not in bufs:
+                    bufs[writer.dpi] = grab_buffer(self.fig, writer.dpi, 
+                                                   savefig_kwargs.get('facecolor'))
+                writer.write_frame(bufs[writer.dpi], duration)
+            else:
+                for _ in range(n_repeats(duration, self.fps)):
+                    writer.grab_frame(**savefig_kwargs)
+
+    def finish(self):
+        # finish every writer, even after one of them failed
+        error = None
+        for writer in self._writers:
+            try:
+                writer.finish()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+
+class ResizeWriter(BufferWriter):
+    '''
+    Passes the frames to another writer at a different size.
+
+    With `scale`, each drawn frame is shrunk by averaging the pixels 
+    covered by every output pixel, so the figure is not drawn again and 
+    the frame drawn for the other outputs of a `TeeWriter` is reused. 
+    With `dpi`, the figure is rasterized once more at that resolution, 
+    which keeps text and thin lines crisp at small sizes. The data and 
+    artists are still only updated once per frame either way.
+
+    Parameters
+    ----------
+    writer : writer instance, str or None, default None
+        Writer receiving the resized frames. It must accept RGBA buffers, 
+        like the in-process GIF, WebP and PNG writers or `FFMpegWriter`. 
+        Within `bar_chart_race` and `line_chart_race`, a writer name or 
+        `None` is replaced by the writer that would otherwise be used for 
+        the filename.
+
+    scale : float, default None
+        Size of the output relative to the drawn frames, greater than 0 and 
+        at most 1.
+
+    dpi : float, default None
+        Resolution at which the figure is drawn for this output instead.
+    '''
+
+    def __init__(self, writer=None, scale=None, dpi=None):
+        if (scale is None) == (dpi is None):
+            raise ValueError('Give exactly one of `scale` and `dpi`')
+        if scale is not None and not 0 < scale <= 1:
+            raise ValueError('`scale` must be greater than 0 and at most 1')
+        self.writer = writer
+        self.scale = scale
+        self.render_dpi = dpi
+
+    @property
+    def fps(self):
+        return self.writer.fps
+
+    @property
+    def metadata(self):
+        return self.writer.metadata
+
+    @property
+    def frame_size(self):
+        return self._size
+
+    def _supports_transparency(self):
+        return self.writer._supports_transparency()
+
+    def setup(self, fig, outfile, dpi=None):
+        if not supports_buffers(self.writer):
+            raise TypeError('The writer of a `ResizeWriter` must accept RGBA buffers')
+        dpi = fig.dpi if dpi is None else dpi
+        self.dpi = dpi if self.render_dpi is None else self.render_dpi
+        self.outfile = outfile
+        self.fig = fig
+        self.frame_duration = 1000 / self.fps
+        # ffmpeg may round the figure size to even pixels for its codec, 
+        # which must not change the frames drawn for the other outputs
+        size = fig.get_size_inches()
+        if self.scale is None:
+            self.writer.setup(fig, outfile, self.dpi)
+        else:
+            # frame sizes are truncated to whole pixels, so aim half a pixel 
+            # above the rounded width to get 1280 pixels from 1920 * 2 / 3
+            width = round(size[0] * dpi * self.scale) + .5
+            self.writer.setup(fig, outfile, width / size[0])
+        self._size = self.writer.frame_size
+        fig.set_size_inches(size)
+
+    def write_frame(self, buf, duration):
+        w, h = self._size
+        if buf.shape[:2] != (h, w):
+            buf = area_resize(buf, (w, h))
+        if isinstance(self.writer, BufferWriter):
+            self.writer.write_frame(buf, duration)
+        else:
+            # the figure size the pipe was opened with was restored in setup
+            for _ in range(n_repeats(duration, self.fps)):
+                self.writer._proc.stdin.write(buf.data)
+
+    def finish(self):
+        self.writer.finish()
+
+
+class FFMpegStreamWriter(animation.FFMpegWriter):
+    '''
+    ffmpeg writer sending the encoded video to a file-like object.
+
+    ffmpeg writes the video to its stdout, which a separate thread copies
+    to the output as it arrives, so nothing is written to disk. MP4 and
+    MOV files are written in fragments of at most one second, as the
+    output cannot seek back to the start.
+
+    Parameters
+    ----------
+    format : str, default 'mp4'
+        Format of the video given as its file extension, i.e. 'mp4', 'mov', 
+        'webm' or 'mkv'.
+
+    Other parameters are those of matplotlib's `FFMpegWriter`.
+    '''
+
+    def __init__(self, format='mp4', fps=5, codec=None, bitrate=None, extra_args=None, 
+                 metadata=None):
+        super().__init__(fps=fps, codec=codec, bitrate=bitrate, extra_args=extra_args, 
+                         metadata=metadata)
+        self.format = format
+
+    def setup(self, fig, outfile, dpi=None):
+        self.stream = outfile
+        # the name only gives the format to `output_args`
+        super().setup(fig, f'stream.{self.format}', dpi)
+
+    @property
+    def output_args(self):
+        args = super().output_args[:-1]
+        args += ['-f', FFMPEG_FORMATS.get(self.format, self.format)]
+        if self.format in ('mp4', 'm4v', 'mov'):
+            # fragments of at most one second let the output arrive while encoding
+            args += ['-movflags', 'frag_keyframe+empty_moov', '-frag_duration', '1000000']
+        return args + ['pipe:1']
+
+    def _run(self):
+        super()._run()
+        self._reader = threading.Thread(target=self.copy_output, daemon=True)
+        self._reader.start()
+
+    def copy_output(self):
+        self._error = None
+        while True:
+            data = self._proc.stdout.read1(1 << 16)
+            if not data:
+                return
+            # keep reading after an error so that ffmpeg never blocks
+            if self._error is None:
+                try:
+                    self.stream.write(data)
+                except BaseException as e:
+                    self._error = e
+                    # stop ffmpeg, making the next frame written to it fail
+                    self._proc.kill()
+
+    def finish(self):
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            # ffmpeg has stopped, the reason is raised below
+            pass
+        self._reader.join()
+        if self._error is not None:
+            self._proc.wait()
+            raise self._error
+        err = self._proc.stderr.read()
+        self._proc.wait()
+        if self._proc.returncode:
+            raise subprocess.CalledProcessError(self._proc.returncode, self._proc.args, 
+                                                None, err)
+
+
+FFMPEG_FORMATS = {'m4v': 'mp4', 'mkv': 'matroska'}
+
+
+def is_frame_pattern(filename):
+    '''
+    Return whether `filename` contains a field for the frame number, such 
+    as '%05d', rather than only a literal '%'.
+    '''
+    return FRAME_FIELD.search(filename) is not None
+
+
+def supports_buffers(writer):
+    if isinstance(writer, DeltaWriter):
+        return True
+    if isinstance(writer, ResizeWriter):
+        return supports_buffers(writer.writer)
+    # pipe-based writers read raw RGBA frames from stdin
+    return (isinstance(writer, animation.MovieWriter) 
+            and not isinstance(writer, animation.FileMovieWriter) 
+            and writer.frame_format == 'rgba')
+
+
+def write_buffer(writer, buf, duration):
+    if isinstance(writer, BufferWriter):
+        writer.write_frame(buf, duration)
+        return
+    w, h = writer.frame_size
+    if buf.shape[:2] != (h, w):
+        raise ValueError(f'Frame of {buf.shape[1]} x {buf.shape[0]} pixels does not '
+                         f'match the {w} x {h} pixels expected by the writer')
+    for _ in range(n_repeats(duration, writer.fps)):
+        writer._proc.stdin.write(buf.data)
+
+
+def n_repeats(duration, fps):
+    # number of frames of a constant frame rate output covering `duration`
+    return max(1, round(duration * fps / 1000))
+
+
+def area_resize(arr, size):
+    '''
+    Resize an (H, W, C) uint8 array to `size`, given as (width, height), 
+    setting each output pixel to the average of the input area it covers.
+    '''
+    out = arr
+    for axis, n in enumerate(size[::-1]):
+        out = area_average(out, n, axis)
+    return np.rint(out).astype(np.uint8)
+
+
+def area_average(arr, n, axis):
+    m = arr.shape[axis]
+    if n == m:
+        return arr
+    # output pixel i covers [start, end) of the input, overlapping each of 
+    # the few input pixels it touches by a fraction of a pixel
+    scale = m / n
+    start = np.arange(n) * scale
+    end = start + scale
+    taps = int(np.max(np.ceil(end - 1e-9) - np.floor(start)))
+    idx = np.floor(start).astype(int)[:, None] + np.arange(taps)
+    weights = np.minimum(idx + 1, end[:, None]) - np.maximum(idx, start[:, None])
+    weights = (np.clip(weights, 0, None) / scale).astype(np.float32)
+    idx = np.minimum(idx, m - 1)
+    shape = [1] * arr.ndim
+    shape[axis] = n
+    out = np.zeros(arr.shape[:axis] + (n,) + arr.shape[axis + 1:], np.float32)
+    for k in range(taps):
+        out += np.take(arr, idx[:, k], axis=axis) * weights[:, k].reshape(shape)
+    return out
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def png_ihdr(width, height):
+    # 8 bits per sample, RGB color, default compression, filter and interlace
+    return png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+
+def deflate_rgb(rgb, compress_level=6):
+    # each scanline is stored as the difference from the one above
+    rows = rgb.reshape(len(rgb), -1)
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+    return zlib.compress(filtered.tobytes(), compress_level)
+
+
+def write_png(paths, rgb, compress_level=6):
+    data = (PNG_SIGNATURE + png_ihdr(rgb.shape[1], rgb.shape[0]) 
+            + png_chunk(b'IDAT', deflate_rgb(rgb, compress_level)) + png_chunk(b'IEND', b''))
+    for path in paths:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def uint24(value):
+    return int(value).to_bytes(3, 'little')
@@ -1,9 +1,14 @@
+import io
+import os
 import pytest
 import matplotlib.pyplot as plt
+from matplotlib import animation
 from typing import Dict, Any
 import pandas as pd
 
-from bar_chart_racer import load_dataset, bar_chart_race
+from bar_chart_racer import (load_dataset, bar_chart_race, render_segments, PipelinedWriter, 
+                             ResizeWriter)
+from bar_chart_racer._bar_chart_race import _BarChartRace
 
 
 # Load test data
@@ -44,6 +49,88 @@ class TestSimpleBC:
         bar_chart_race(df, sort='asc', steps_per_period=2)
         bar_chart_race(df, sort='asc', steps_per_period=30)
 
+    def test_end_period_pause(self):
+        """Test pauses written without drawing them."""
+        bar_chart_race(df, 'tests/videos/test_pause.mp4', n_bars=6, end_period_pause=300)
+        bar_chart_race(df, 'tests/videos/test_pause.gif', n_bars=6, end_period_pause=300)
+        frames = list(bar_chart_race(df, n_bars=6, steps_per_period=4, period_length=400,
+                                     end_period_pause=200, output='frames'))
+        assert len(frames) == (len(df) - 1) * 4 + 1 + (len(df) - 2) * 2
+        assert (frames[5][2] == frames[4][2]).all()
+
+    def test_repeated_frames(self):
+        """Test reusing frames that look the same as the frame before."""
+        df_flat = pd.concat([df.iloc[:1]] * 3 + [df])
+        with pytest.warns(UserWarning, match='^30 of 61 frames look the same'):
+            frames = list(bar_chart_race(df_flat, n_bars=6, output='frames'))
+        assert (frames[1][2] == frames[0][2]).all()
+        with pytest.warns(UserWarning, match='^30 of 61 frames look the same'):
+            bar_chart_race(df_flat, 'tests/videos/test_repeated.gif', n_bars=6)
+        with pytest.warns(UserWarning, match='^5 of 11 frames look the same'):
+            bar_chart_race(df_flat, 'tests/videos/test_repeated.gif', n_bars=6, 
+                           frame_range=(25, 36))
+
+    def test_step_budget(self):
+        """Test sharing out the steps between the periods."""
+        bar_chart_race(df, 'tests/videos/test_budget.gif', n_bars=6, step_budget=12)
+        bar_chart_race(df, 'tests/videos/test_budget.mp4', n_bars=6, step_budget=12)
+        with pytest.raises(ValueError):
+            bar_chart_race(df, step_budget=0)
+
+    def test_ranges(self):
+        """Test drawing part of the race."""
+        frames = list(bar_chart_race(df, n_bars=6, end_period_pause=200, output='frames'))
+        part = list(bar_chart_race(df, n_bars=6, end_period_pause=200, output='frames',
+                                   frame_range=(12, None)))
+        assert [k for k, _, _ in part] == list(range(12, len(frames)))
+        assert (part[0][2] == frames[12][2]).all()
+        bar_chart_race(df, 'tests/videos/test_range.mp4', n_bars=6, period_range=(1, 3))
+        with pytest.raises(ValueError):
+            bar_chart_race(df, frame_range=(0, 5), period_range=(0, 1))
+
+    def test_checkpoint_resume(self, monkeypatch, tmp_path):
+        """Test resuming an interrupted render from its saved chunks."""
+        monkeypatch.setattr(_BarChartRace, 'checkpoint_frames', 15)
+        kwargs = dict(n_bars=6, end_period_pause=200, steps_per_period=30)
+        full = tmp_path / 'full.mp4'
+        bar_chart_race(df, str(full), checkpoint_dir=str(tmp_path / 'full'), **kwargs)
+
+        anim_func = _BarChartRace.anim_func
+        n_drawn = []
+        def crash(self, i):
+            n_drawn.append(i)
+            if len(n_drawn) == 40:
+                raise RuntimeError('crash')
+            anim_func(self, i)
+
+        resumed = tmp_path / 'resumed.mp4'
+        checkpoint_dir = str(tmp_path / 'resumed')
+        with monkeypatch.context() as m:
+            m.setattr(_BarChartRace, 'anim_func', crash)
+            with pytest.raises(RuntimeError):
+                bar_chart_race(df, str(resumed), checkpoint_dir=checkpoint_dir, **kwargs)
+        assert not resumed.exists()
+        bar_chart_race(df, str(resumed), checkpoint_dir=checkpoint_dir, **kwargs)
+        assert resumed.read_bytes() == full.read_bytes()
+
+    def test_render_segments(self):
+        """Test rendering segments and joining them."""
+        render_segments(bar_chart_race, df, 'tests/videos/test_segments.mp4', n_segments=2,
+                        n_bars=6)
+        render_segments(bar_chart_race, df, 'tests/videos/test_segments.mkv', n_segments=3,
+                        max_workers=1, n_bars=6)
+        with pytest.raises(ValueError):
+            render_segments(bar_chart_race, df, 'tests/videos/test_segments.gif')
+
+    def test_render_segments_unpicklable(self, caplog):
+        """Test rendering segments with functions worker processes cannot receive."""
+        with caplog.at_level('WARNING', logger='bar_chart_racer'):
+            render_segments(bar_chart_race, df, 'tests/videos/test_segments_lambda.mp4', 
+                            n_segments=2, max_workers=2, n_bars=6, 
+                            tick_template=lambda x, pos: f'{x:.0f}')
+        assert 'cannot be pickled' in caplog.text
+        assert os.path.exists('tests/videos/test_segments_lambda.mp4')
+
     def test_interpolate_period(self):
         """Test period interpolation."""
         bar_chart_race(df, interpolate_period=True, n_bars=8)
@@ -129,6 +216,18 @@ class TestSimpleBC:
     def test_writer(self):
         """Test different writers."""
         bar_chart_race(df, 'tests/videos/test.gif', n_bars=6, writer='pillow')
+        bar_chart_race(df, 'tests/videos/test_inprocess.gif', n_bars=6)
+        bar_chart_race(df, 'tests/videos/test.webp', n_bars=6)
+        bar_chart_race(df, 'tests/videos/test.png', n_bars=6)
+        bar_chart_race(df, 'tests/videos/frames/%04d.png', n_bars=6)
+        bar_chart_race(df, 'tests/videos/test_pipelined.mp4', n_bars=6,
+                       writer=PipelinedWriter(animation.FFMpegWriter(fps=20), queue_size=2))
+        bar_chart_race(df, ['tests/videos/test_tee.mp4', 'tests/videos/test_tee.gif'], n_bars=6)
+        bar_chart_race(df, ['tests/videos/test_tee.webp', 'tests/videos/test_tee.html'], n_bars=6,
+                       writer=[None, 'html'])
+        bar_chart_race(df, ['tests/videos/test_full.mp4', 'tests/videos/test_half.mp4',
+                            'tests/videos/test_small.gif'], n_bars=6,
+                       writer=[None, ResizeWriter(scale=.5), ResizeWriter(dpi=48)])
 
     def test_fig(self):
         """Test using a custom figure."""
@@ -138,4 +237,48 @@ class TestSimpleBC:
     def test_bar_kwargs(self):
         """Test bar keyword arguments."""
         bar_chart_race(df, n_bars=6, bar_kwargs={'alpha': .2, 'ec': 'black', 'lw': 3})
-        
\ No newline at end of file
+        
+    def test_output_frames(self):
+        """Test yielding frames as arrays."""
+        frames = list(bar_chart_race(df, n_bars=6, steps_per_period=4, output='frames'))
+        assert len(frames) == (len(df) - 1) * 4 + 1
+        i, period, frame = frames[-1]
+        assert i == len(frames) - 1
+        assert frame.ndim == 3 and frame.shape[2] == 4 and frame.dtype == 'uint8'
+
+    def test_backend_raster(self):
+        """Test drawing the frames straight into a pixel array."""
+        frames = list(bar_chart_race(df, n_bars=6, steps_per_period=4, output='frames'))
+        raster = list(bar_chart_race(df, n_bars=6, steps_per_period=4, output='frames',
+                                     backend='raster'))
+        assert len(raster) == len(frames)
+        for (_, _, frame), (_, _, raster_frame) in zip(frames, raster):
+            diff = abs(frame.astype(int) - raster_frame.astype(int))
+            assert diff.max() <= 8
+        bar_chart_race(df, 'tests/videos/test_raster.gif', n_bars=6, backend='raster',
+                       period_summary_func=lambda v, r: {'x': .99, 'y': .05, 's': 'Total',
+                                                         'ha': 'right'})
+        with pytest.raises(ValueError):
+            bar_chart_race(df, orientation='v', backend='raster')
+        with pytest.raises(ValueError):
+            bar_chart_race(df, backend='agg')
+
+    def test_output_file_like(self):
+        """Test writing to a file-like object."""
+        for ext in ['mp4', 'gif', 'webp']:
+            buf = io.BytesIO()
+            bar_chart_race(df, f'test.{ext}', n_bars=6, output=buf)
+            assert len(buf.getvalue()) > 0
+        buf = io.BytesIO()
+        bar_chart_race(df, 'test.mp4', n_bars=6, output=buf, writer='ffmpeg')
+        assert buf.getvalue()[4:8] == b'ftyp'
+        for writer in ['imagemagick', animation.FFMpegWriter()]:
+            with pytest.raises(ValueError, match='file-like'):
+                bar_chart_race(df, 'test.gif', n_bars=6, output=io.BytesIO(), writer=writer)
+
+    def test_output_html(self):
+        """Test linking the saved animation from an html tag."""
+        html = bar_chart_race(df, 'tests/videos/test_link.mp4', n_bars=6, output='html')
+        assert 'src="tests/videos/test_link.mp4"' in html.data
+        html = bar_chart_race(df, 'tests/videos/test_link.gif', n_bars=6, output='html')
+        assert html.data.startswith('<img')
@@ -1,10 +1,16 @@
+import inspect
+import io
+import json
 import pytest
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import Dict, Any, Callable, List, Union
 import numpy as np
+from matplotlib import dates as mdates
 
 import bar_chart_racer as bcr
+from bar_chart_racer._line_chart_race import _LineChartRace
+from bar_chart_racer._utils import hash_content
 
 
 # Load test data
@@ -37,6 +43,164 @@ class TestBasics:
         bcr.line_chart_race(df_race, n_lines=4, images='country', others_line_func=True, steps_per_period=20)
         bcr.line_chart_race(df_race, n_lines=4, images='country', others_line_func=True, steps_per_period=3)
 
+    def test_step_budget(self):
+        """Test step budget parameter."""
+        bcr.line_chart_race(df_race, 'tests/videos/lcr_budget.gif', n_lines=4, step_budget=20)
+
+    def test_ranges(self):
+        """Test drawing part of the race."""
+        frames = list(bcr.line_chart_race(df_race, n_lines=4, fade=.9, output='frames'))
+        part = list(bcr.line_chart_race(df_race, n_lines=4, fade=.9, output='frames',
+                                        frame_range=(5, 15)))
+        assert [k for k, _, _ in part] == list(range(5, 15))
+        assert (part[0][2] == frames[5][2]).all()
+        bcr.line_chart_race(df_race, 'tests/videos/lcr_range.mp4', n_lines=4, period_range=(1, 3))
+
+    def test_line_chart_frame(self):
+        """Test drawing a single frame without the frames before it."""
+        kwargs = dict(n_lines=4, fade=.9, min_fade=.2, end_period_pause=200,
+                      line_width_data=df_race.abs(), steps_per_period=5)
+        frames = list(bcr.line_chart_race(df_race, output='frames', **kwargs))
+        for k in (7, 13, -1):
+            frame = bcr.line_chart_frame(df_race, k, **kwargs)
+            assert (frame == frames[k][2]).all()
+        with pytest.raises(IndexError):
+            bcr.line_chart_frame(df_race, len(frames), **kwargs)
+        with pytest.raises(TypeError):
+            bcr.line_chart_frame(df_race, 0, frame_range=(0, 5))
+
+    def test_frame_arrays(self):
+        """Test the arrays prepared for each row against looking up each row."""
+        kwargs = dict(n_lines=4, fade=.9, steps_per_period=4, agg_line_func='median',
+                      others_line_func='mean', line_width_data=df_race.abs() / 1000)
+        args = inspect.signature(bcr.line_chart_race).bind(df_race, output='frames', **kwargs)
+        args.apply_defaults()
+        race = _LineChartRace(**args.arguments)
+        # rows between the periods are interpolated
+        assert len(race.x_values) == (len(df_race) - 1) * 4 + 1
+        x, values, widths = [], {col: [] for col in race.line_values}, {}
+        for i in range(len(race.df_values)):
+            s = race.df_values.iloc[i]
+            x.append(mdates.date2num(s.name))
+            for col in race.df_values.columns:
+                values[col].append(s[col])
+                lw = race.line_width_data.iloc[i // race.steps_per_period][col]
+                widths.setdefault(col, []).append(lw)
+            values['___agg_line___'].append(race.agg_line.iloc[i])
+            values['___others_line___'].append(race.others_agg_line.iloc[i])
+        assert np.array_equal(race.x_values, x)
+        for col in values:
+            assert np.array_equal(race.line_values[col], values[col], equal_nan=True)
+        for col in widths:
+            assert np.array_equal(race.line_widths[col], widths[col])
+
+        frames = list(bcr.line_chart_race(df_race, output='frames', **kwargs))
+        race.x_values = np.array(x)
+        race.line_values = {col: np.array(v) for col, v in values.items()}
+        race.line_widths = {col: np.array(v) for col, v in widths.items()}
+        drawn = list(race.iter_frames())
+        assert len(drawn) == len(frames)
+        for (_, _, frame), (_, _, expected) in zip(drawn, frames):
+            assert (frame == expected).all()
+
+    def test_history_buffer(self):
+        """Test drawing the lines from a raster of their history."""
+        frames = list(bcr.line_chart_race(df_race, n_lines=4, output='frames'))
+        buffered = list(bcr.line_chart_race(df_race, n_lines=4, output='frames',
+                                            history_buffer=True))
+        assert len(buffered) == len(frames)
+        for (_, _, frame), (_, _, expected) in zip(buffered, frames):
+            # only where lines cross are the newer segments drawn over older ones
+            diff = abs(frame[..., :3].astype(int) - expected[..., :3])
+            assert diff.mean() < .05
+            assert (diff.max(axis=2) > 32).mean() < .001
+        bcr.line_chart_race(df_race, 'tests/videos/lcr_history.mp4', n_lines=4, 
+                            others_line_func=True, history_buffer=True)
+        with pytest.raises(ValueError):
+            bcr.line_chart_race(df_race, fade=.9, history_buffer=True)
+
+    def test_decimate(self):
+        """Test keeping about four points per pixel column of older history."""
+        df_walk = pd.DataFrame(np.random.default_rng(0).normal(size=(300, 3)).cumsum(axis=0),
+                               columns=['a', 'b', 'c'])
+        kwargs = dict(steps_per_period=1, fig_kwargs={'figsize': (1, 1), 'dpi': 40},
+                      output='frames')
+        frames = list(bcr.line_chart_race(df_walk, decimate=True, **kwargs))
+        assert len(frames) == len(df_walk) - 1
+        expected = list(bcr.line_chart_race(df_walk, **kwargs))
+        for (_, _, frame), (_, _, expected_frame) in zip(frames, expected):
+            diff = abs(frame[..., :3].astype(int) - expected_frame[..., :3])
+            assert diff.mean() < 2
+            assert (diff.max(axis=2) > 32).mean() < .03
+
+    def test_spread_labels(self):
+        """Test moving crowded line labels apart."""
+        df_close = pd.DataFrame(np.random.default_rng(0).normal(size=(4, 30)).cumsum(axis=0),
+                                columns=[f'line {k}' for k in range(30)])
+        frames = list(bcr.line_chart_race(df_close, steps_per_period=2, spread_labels=True, 
+                                          agg_line_func='mean', output='frames'))
+        assert len(frames) == 2 * (len(df_close) - 1)
+
+        args = inspect.signature(bcr.line_chart_race).bind(
+            df_close, steps_per_period=2, spread_labels=True, output='frames')
+        args.apply_defaults()
+        race = _LineChartRace(**args.arguments)
+        ranks = race.df_ranks.to_numpy()
+        n_checked = 0
+        for k, _, _ in race.iter_frames():
+            # frames where some lines have crossed since the row before, 
+            # frame k showing row k + 1 after row 0 drawn by init_func
+            if (ranks[k + 1] == ranks[k]).all():
+                continue
+            boxes = sorted((text.get_window_extent() for col, text in race.texts.items()
+                            if col != '__period_summary_func__' and text.get_visible()),
+                           key=lambda box: box.y0)
+            assert len(boxes) == 30
+            for below, above in zip(boxes, boxes[1:]):
+                assert below.y1 <= above.y0 + .01
+            n_checked += 1
+        assert n_checked > 0
+
+    def test_checkpoint_dir(self):
+        """Test saving a video in chunks that a later call can resume."""
+        bcr.line_chart_race(df_race, 'tests/videos/lcr_checkpoint.mp4', n_lines=4, fade=.9,
+                            checkpoint_dir='tests/videos/checkpoints')
+        with pytest.raises(ValueError):
+            bcr.line_chart_race(df_race, 'tests/videos/lcr_checkpoint.gif',
+                                checkpoint_dir='tests/videos/checkpoints')
+
+    def test_checkpoint_inputs(self, monkeypatch, tmp_path):
+        """Test that chunks are only reused for the same data and figure."""
+        monkeypatch.setattr(_LineChartRace, 'checkpoint_frames', 15)
+        kwargs = dict(n_lines=4, others_line_func='mean', steps_per_period=10)
+        anim_func = _LineChartRace.anim_func
+        n_drawn = []
+        def crash(self, i):
+            n_drawn.append(i)
+            if len(n_drawn) == 40:
+                raise RuntimeError('crash')
+            anim_func(self, i)
+
+        checkpoint_dir = tmp_path / 'checkpoints'
+        with monkeypatch.context() as m:
+            m.setattr(_LineChartRace, 'anim_func', crash)
+            with pytest.raises(RuntimeError):
+                bcr.line_chart_race(df_race, str(tmp_path / 'race.mp4'), 
+                                    checkpoint_dir=str(checkpoint_dir), **kwargs)
+        saved = sorted(checkpoint_dir.glob('*.mp4'))
+        assert saved
+        # a column outside the top lines still feeds the others line
+        df_changed = df_race.copy()
+        df_changed['Sweden'] *= 2
+        bcr.line_chart_race(df_changed, str(tmp_path / 'race.mp4'), 
+                            checkpoint_dir=str(checkpoint_dir), **kwargs)
+        assert sorted(checkpoint_dir.glob('*.mp4')) == saved
+
+        fig1, fig2 = plt.Figure(), plt.Figure()
+        fig1.add_subplot()
+        fig2.add_subplot().set_facecolor('.9')
+        assert hash_content(df_race, {'fig': fig1}) != hash_content(df_race, {'fig': fig2})
+
     def test_period_length(self):
         """Test period length parameter."""
         bcr.line_chart_race(
@@ -60,6 +224,32 @@ class TestBasics:
             others_line_kwargs={'s': 'Sum Others', 'color': '.5', 'lw': 3}, steps_per_period=5
         )
 
+    def test_others_line_func_vectorized(self):
+        """Test others line function called once on all values."""
+        def q90(values):
+            return np.nanquantile(values, .9, axis=1)
+        q90.vectorized = True
+        bcr.line_chart_race(
+            df_race, n_lines=4, others_line_func=q90, agg_line_func='median',
+            steps_per_period=5
+        )
+        q90_bad = lambda values: values.sum()
+        q90_bad.vectorized = True
+        with pytest.raises(ValueError):
+            bcr.line_chart_race(df_race, n_lines=4, others_line_func=q90_bad)
+
+    def test_others_line_func_band(self):
+        """Test others drawn as a single band of quantiles."""
+        bcr.line_chart_race(df_race, n_lines=4, others_line_func='band', steps_per_period=5)
+        bcr.line_chart_race(
+            df_race, n_lines=4, others_line_func='band',
+            others_line_kwargs={'quantiles': (.25, .75), 'color': '.5', 'alpha': .5},
+            steps_per_period=5
+        )
+        with pytest.raises(ValueError):
+            bcr.line_chart_race(df_race, n_lines=4, others_line_func='band',
+                                others_line_kwargs={'quantiles': (.9, .1)})
+
     def test_agg_line_func(self):
         """Test aggregate line function."""
         bcr.line_chart_race(
@@ -192,3 +382,63 @@ class TestBasics:
             df_race, 'tests/videos/test_html.html', n_lines=5, images='country',
             steps_per_period=5
         )
+
+        bcr.line_chart_race(df_race, 'tests/videos/lcr.gif', n_lines=5, steps_per_period=5)
+        bcr.line_chart_race(df_race, 'tests/videos/lcr.webp', n_lines=5, steps_per_period=5)
+        bcr.line_chart_race(df_race, 'tests/videos/lcr.png', n_lines=5, steps_per_period=5)
+        bcr.line_chart_race(df_race, 'tests/videos/lcr_frames/%04d.png', n_lines=5, steps_per_period=5)
+        bcr.line_chart_race(df_race, ['tests/videos/lcr_tee.mp4', 'tests/videos/lcr_tee.png'],
+                            n_lines=5, steps_per_period=5)
+        bcr.line_chart_race(df_race, 'tests/videos/lcr_half.webp', n_lines=5, steps_per_period=5,
+                            writer=bcr.ResizeWriter(scale=.5))
+
+        buf = io.BytesIO()
+        bcr.line_chart_race(df_race, 'lcr.mp4', n_lines=5, steps_per_period=5, output=buf)
+        assert len(buf.getvalue()) > 0
+
+        html = bcr.line_chart_race(df_race, 'tests/videos/lcr_link.webp', n_lines=5,
+                                   steps_per_period=5, output='html')
+        assert html.data.startswith('<img src="tests/videos/lcr_link.webp"')
+
+    def test_html_pause(self, monkeypatch):
+        """Test embedding a video with pauses written without drawing them."""
+        anim_func = _LineChartRace.anim_func
+        drawn = []
+        def record(self, i):
+            drawn.append(i)
+            anim_func(self, i)
+
+        monkeypatch.setattr(_LineChartRace, 'anim_func', record)
+        html = bcr.line_chart_race(df_race, n_lines=4, steps_per_period=4, period_length=400,
+                                   end_period_pause=200)
+        assert 'base64' in getattr(html, 'data', html)
+        assert None not in drawn
+
+    def test_frame_sequence_fps(self, tmp_path):
+        """Test frame sequence writers taking the fps of the chart."""
+        kwargs = dict(n_lines=4, steps_per_period=4, period_length=400, end_period_pause=200)
+        bcr.line_chart_race(df_race, str(tmp_path / 'a' / '%04d.png'), **kwargs)
+        bcr.line_chart_race(df_race, str(tmp_path / 'b' / '%04d.png'), **kwargs,
+                            writer=bcr.FrameSequenceWriter(skip_existing=True))
+        manifests = [json.loads((tmp_path / name / 'manifest.json').read_text())
+                     for name in 'ab']
+        assert manifests[0]['fps'] == 10
+        assert manifests[0] == manifests[1]
+        assert len(list((tmp_path / 'b').glob('*.png'))) == manifests[1]['n_frames']
+
+    def test_percent_filename(self, tmp_path):
+        """Test a literal '%' in a PNG filename."""
+        kwargs = dict(n_lines=4, steps_per_period=2)
+        bcr.line_chart_race(df_race, str(tmp_path / 'growth_5%.png'), **kwargs)
+        assert [p.name for p in tmp_path.iterdir()] == ['growth_5%.png']
+        bcr.line_chart_race(df_race, str(tmp_path / 'frames' / '5%_%02d.png'), **kwargs)
+        assert (tmp_path / 'frames' / '5%_00.png').exists()
+        assert (tmp_path / 'frames' / 'manifest.json').exists()
+
+    def test_output_frames(self):
+        """Test yielding frames as arrays."""
+        frames = list(bcr.line_chart_race(df_race, n_lines=5, steps_per_period=5, output='frames'))
+        assert len(frames) == (len(df_race) - 1) * 5
+        i, period, frame = frames[-1]
+        assert period == df_race.index.astype(str)[-1]
+        assert frame.ndim == 3 and frame.shape[2] == 4 and frame.dtype == 'uint8'
@@ -1,3 +1,4 @@
+import io
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -8,6 +9,7 @@ import plotly.graph_objects as go
 import plotly
 from plotly.subplots import make_subplots
 from bar_chart_racer import load_dataset, bar_chart_race_plotly
+from bar_chart_racer._utils import hash_content
 
 
 # Load test data
@@ -129,3 +131,64 @@ def test_all():
 
     # Test HTML output
     bar_chart_race_plotly(df, 'tests/videos/test.html', n_bars=6, write_html_kwargs={'auto_play': False})
+
+    # Test lazily loaded frames
+    bar_chart_race_plotly(df, 'tests/videos/test_lazy.html', n_bars=6, lazy_frames=20)
+    bar_chart_race_plotly(
+        df,
+        'tests/videos/test_lazy_files.html',
+        n_bars=6,
+        lazy_frames={'inline': 20, 'chunk_size': 30, 'mode': 'files'}
+    )
+
+    # Test deterministic output and content hash, written to two files so 
+    # that the second is not skipped as up to date
+    bar_chart_race_plotly(df, 'tests/videos/test_hash.html', n_bars=6, content_hash=True)
+    bar_chart_race_plotly(df, 'tests/videos/test_hash2.html', n_bars=6, content_hash=True)
+    with open('tests/videos/test_hash.html') as f:
+        first = f.read()
+    with open('tests/videos/test_hash2.html') as f:
+        assert f.read() == first
+
+    # Test writing to a file-like object
+    buf = io.StringIO()
+    bar_chart_race_plotly(df, n_bars=6, output=buf)
+    assert buf.getvalue() == first.split('\n', 1)[1]
+
+
+def test_content_hash_chunk_files(tmp_path):
+    filename = str(tmp_path / 'race.html')
+    kwargs = dict(n_bars=6, content_hash=True,
+                  lazy_frames={'inline': 2, 'chunk_size': 3, 'mode': 'files'})
+    bar_chart_race_plotly(df, filename, **kwargs)
+    chunk = tmp_path / 'race_frames_1.json'
+    text = chunk.read_text()
+    # a page missing one of its chunks is written again
+    chunk.unlink()
+    bar_chart_race_plotly(df, filename, **kwargs)
+    assert chunk.read_text() == text
+
+
+SCALE = 100
+
+
+def scaled(values):
+    return values * SCALE
+
+
+def test_content_hash_inputs(monkeypatch):
+    def summary(values, ranks):
+        return {'x': .9, 'y': .1, 's': f'{scaled(values.sum()):,.0f}'}
+
+    first = hash_content(df, {'period_summary_func': summary})
+    assert hash_content(df, {'period_summary_func': summary}) == first
+    # values and helpers the function looks up in its module
+    monkeypatch.setitem(globals(), 'SCALE', 1000)
+    assert hash_content(df, {'period_summary_func': summary}) != first
+    monkeypatch.undo()
+    monkeypatch.setitem(globals(), 'scaled', lambda values: values)
+    assert hash_content(df, {'period_summary_func': summary}) != first
+    monkeypatch.undo()
+    # output saved by another version of the package
+    monkeypatch.setattr(bcr, '__version__', '0.0.0')
+    assert hash_content(df, {'period_summary_func': summary}) != first